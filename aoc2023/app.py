@@ -11,30 +11,47 @@ See project license for more info
 """
 
 from pathlib import Path
+from time import sleep
+from typing import Optional
 
 from loguru import logger as LOG
 from rich import print as pprint
-from typer import Argument, Option, Typer
+from typer import Argument, BadParameter, Option, Typer
 from typing_extensions import Annotated
 
-from aoc2023.common.file_load import load_input_file
-from aoc2023.problems.day_1 import compute_calibration_numbers
+from aoc2023.common.file_load import iter_input_file, load_input_file
+from aoc2023.problems.day_1 import (
+    VOCABULARIES,
+    LineCache,
+    compute_calibration_numbers,
+    compute_calibration_numbers_parallel,
+    compute_digits_calibration_numbers,
+)
 from aoc2023.problems.day_2 import (
-    check_posible_games,
-    compute_min_values_per_game,
-    compute_sum_of_powers,
+    ColourSchema,
+    FeasibilityIndex,
+    GameAggregator,
+    GameStore,
+    compute_game_checksums,
+    parse_bag_configurations,
 )
 from aoc2023.problems.day_3 import (
+    PART_NUMBER_STRATEGIES,
+    Schematic,
     compute_gear_ratios,
     compute_parts_sum,
-    find_gears,
     find_part_numbers,
-    parse_lines,
 )
+from aoc2023.problems.day_3 import solve_streaming as d3_solve_streaming
 from aoc2023.problems.day_4 import solve_part_1 as d4_solve_part_1
 from aoc2023.problems.day_4 import solve_part_2 as d4_solve_part_2
+from aoc2023.problems.day_5 import DEFAULT_CHUNK_SIZE as D5_DEFAULT_CHUNK_SIZE
 from aoc2023.problems.day_5 import solve_part_1 as d5_solve_part_1
 from aoc2023.problems.day_5 import solve_part_2 as d5_solve_part_2
+from aoc2023.problems.day_5 import (
+    solve_part_2_brute_force as d5_solve_part_2_brute_force,
+)
+from aoc2023.problems.day_5 import solve_part_2_reverse as d5_solve_part_2_reverse
 from aoc2023.utils.logging_utils import CustomizedLogger, LogConfig, LogLevel
 from aoc2023.utils.timing_utils import gen_utc_aware_datetime
 
@@ -108,6 +125,31 @@ def day1(
             help="Select the problem part you want to solve",
         ),
     ] = 1,
+    workers: Annotated[
+        int,
+        Option(
+            "--workers",
+            "-w",
+            min=0,
+            help="Process the file in newline aligned chunks with this number of workers",
+        ),
+    ] = 0,
+    vocabulary: Annotated[
+        str,
+        Option(
+            "--vocabulary",
+            help="Vocabulary of spelled out digits (part 2 only, e.g. english, spanish)",
+        ),
+    ] = "english",
+    line_cache: Annotated[
+        int,
+        Option(
+            "--line-cache",
+            min=0,
+            help="Remember the values of up to this number of distinct lines (part 2 only, not "
+            "compatible with --workers)",
+        ),
+    ] = 0,
 ) -> None:
     """Day one problems interface."""
 
@@ -115,14 +157,41 @@ def day1(
     LOG.info("Beginning Day 1 activity!")
     print(f"\tDay 1 input file is in: {file}")
 
-    lines_to_process = load_input_file(file)
+    if vocabulary not in VOCABULARIES:
+        raise BadParameter(
+            f"Unknown vocabulary '{vocabulary}', use one of {tuple(VOCABULARIES)}",
+            param_hint="--vocabulary",
+        )
+    if part == 1 and vocabulary != "english":
+        raise BadParameter(
+            "Vocabularies only apply to part 2", param_hint="--vocabulary"
+        )
+    if line_cache and (part == 1 or workers):
+        raise BadParameter(
+            "The line cache only applies to part 2 without --workers",
+            param_hint="--line-cache",
+        )
+
+    pattern = "digits" if part == 1 else "alpha"
 
     checksum = -1
-    match part:
-        case 1:
-            __, checksum = compute_calibration_numbers(lines_to_process, "digits")
-        case 2:
-            __, checksum = compute_calibration_numbers(lines_to_process, "alpha")
+    if workers:
+        __, checksum = compute_calibration_numbers_parallel(
+            file, pattern, workers, vocabulary=vocabulary
+        )
+    elif pattern == "digits":
+        __, checksum = compute_digits_calibration_numbers(file.read_bytes(), False)
+    else:
+        lines_to_process = load_input_file(file)
+        cache = LineCache(line_cache) if line_cache else None
+        __, checksum = compute_calibration_numbers(
+            lines_to_process, pattern, vocabulary, cache
+        )
+        if cache is not None:
+            pprint(
+                f"\tLine cache: {cache.hits} hits, {cache.misses} misses "
+                f"({cache.hit_ratio:.1%} hit ratio)"
+            )
 
     pprint(f"\t[bold green]Calibration checksum is {checksum}\n")
 
@@ -156,6 +225,40 @@ def day2(
             help="Select the problem part you want to solve",
         ),
     ] = 1,
+    bags_file: Annotated[
+        Optional[Path],
+        Option(
+            "--bags-file",
+            file_okay=True,
+            dir_okay=False,
+            resolve_path=True,
+            exists=True,
+            help="File with one bag configuration (red green blue) per line, for part 1",
+        ),
+    ] = None,
+    colours: Annotated[
+        str,
+        Option(
+            "--colours",
+            help="Comma separated colours of the cubes, in the order used by the bags",
+        ),
+    ] = "red,green,blue",
+    follow: Annotated[
+        bool,
+        Option(
+            "--follow",
+            "-f",
+            help="Keep reading the games appended to the file, updating both checksums",
+        ),
+    ] = False,
+    interval: Annotated[
+        float,
+        Option(
+            "--interval",
+            min=0.0,
+            help="Seconds between reads of the file in --follow mode",
+        ),
+    ] = 1.0,
 ) -> None:
     """Day two problems interface."""
 
@@ -163,16 +266,62 @@ def day2(
     LOG.info("Beginning Day 1 activity!")
     print(f"\tDay 2 input file is in: {file}")
 
+    try:
+        schema = ColourSchema.from_string(colours)
+    except ValueError as err:
+        raise BadParameter(str(err), param_hint="--colours") from err
+
+    if follow:
+        try:
+            aggregator = GameAggregator(max_values, schema)
+        except ValueError as err:
+            raise BadParameter(str(err), param_hint="--colours") from err
+
+        pprint("\t[blue]Following the file, press Ctrl+C to stop\n")
+        try:
+            while True:
+                if aggregator.update(file):
+                    ids_sum, sum_of_powers = aggregator.checksums
+                    pprint(
+                        f"\t[bold green]{aggregator.n_games} games: posible games checksum is "
+                        f"{ids_sum}, min posible values checksum is {sum_of_powers}"
+                    )
+                sleep(interval)
+        except KeyboardInterrupt:
+            print()
+        return
+
     lines_to_process = load_input_file(file)
 
     match part:
+        case 1 if bags_file:
+            try:
+                bags = parse_bag_configurations(load_input_file(bags_file), schema)
+            except ValueError as err:
+                raise BadParameter(str(err), param_hint="--bags-file") from err
+            store = GameStore.from_lines(lines_to_process, schema)
+            try:
+                index = FeasibilityIndex(store)
+                checksums = [index.posible_ids_sum(bag) for bag in bags]
+            except ValueError as err:
+                LOG.warning("Falling back to scanning the game store: {}", err)
+                checksums = store.posible_ids_sums(bags)
+            for bag, checksum in zip(bags, checksums):
+                pprint(f"\t[bold green]Posible games checksum for {bag} is {checksum}")
+            print()
+
+        case 1 if len(schema) != len(max_values):
+            raise BadParameter(
+                "Use --bags-file to define bags for a custom set of colours",
+                param_hint="--colours",
+            )
+
         case 1:
-            __, checksum = check_posible_games(lines_to_process, max_values)
+            checksum, __ = compute_game_checksums(lines_to_process, max_values, schema)
             pprint(f"\t[bold green]Posible games checksum is {checksum}\n")
 
         case 2:
-            min_values_per_game = compute_min_values_per_game(lines_to_process)
-            checksum = compute_sum_of_powers(min_values_per_game)
+            __, checksum = compute_game_checksums(lines_to_process, max_values, schema)
             pprint(f"\t[bold green]Min posible values checksum is {checksum}\n")
 
 
@@ -199,6 +348,20 @@ def day3(
             help="Select the problem part you want to solve",
         ),
     ] = 1,
+    strategy: Annotated[
+        str,
+        Option(
+            "--strategy",
+            help=f"Part numbers strategy for part 1, one of {PART_NUMBER_STRATEGIES}",
+        ),
+    ] = "grid",
+    stream: Annotated[
+        bool,
+        Option(
+            "--stream",
+            help="Read the schematic row by row, keeping only three rows in memory",
+        ),
+    ] = False,
 ) -> None:
     """Day three problems interface."""
 
@@ -206,16 +369,27 @@ def day3(
     LOG.info("Beginning Day 3 activity!")
     print(f"\tDay 3 input file is in: {file}")
 
+    if stream:
+        parts_checksum, gears_checksum = d3_solve_streaming(iter_input_file(file))
+        match part:
+            case 1:
+                pprint(f"\t[bold green]Part numbers checksum is {parts_checksum}\n")
+            case 2:
+                pprint(f"\t[bold green]Gear ratios checksum is {gears_checksum}\n")
+        return
+
     lines_to_process = load_input_file(file)
 
     match part:
         case 1:
-            part_numbers = find_part_numbers(lines_to_process)
+            try:
+                part_numbers = find_part_numbers(lines_to_process, strategy)
+            except ValueError as err:
+                raise BadParameter(str(err), param_hint="--strategy") from err
             checksum = compute_parts_sum(part_numbers)
             pprint(f"\t[bold green]Part numbers checksum is {checksum}\n")
         case 2:
-            parts, symbols = parse_lines(lines_to_process)
-            gears = find_gears(parts, symbols)
+            gears = Schematic(lines_to_process).gears()
             computed_gear_ratios = compute_gear_ratios(gears)
             checksum = sum(computed_gear_ratios)
             pprint(f"\t[bold green]Gear ratios checksum is {checksum}\n")
@@ -262,6 +436,18 @@ def day4(
             pprint(f"\t[bold green]Final number of cards is {no_cards}\n")
 
 
+def report_day5_progress(processed: int, best: int) -> None:
+    """Renders the progress of the day five solvers.
+
+    Args:
+        processed (int): Number of seeds processed so far.
+        best (int): Lowest location found so far.
+    """
+
+    LOG.debug("Processed {} seeds, best location so far is {}", processed, best)
+    pprint(f"\t[yellow]{processed:,} seeds processed, best location so far is {best}")
+
+
 @app.command()
 def day5(
     file: Annotated[
@@ -285,6 +471,38 @@ def day5(
             help="Select the problem part you want to solve",
         ),
     ] = 1,
+    workers: Annotated[
+        int,
+        Option(
+            "--workers",
+            "-w",
+            min=0,
+            help="Solve part 2 by brute force with this number of worker processes (part 2 only)",
+        ),
+    ] = 0,
+    chunk_size: Annotated[
+        int,
+        Option(
+            "--chunk-size",
+            min=1,
+            help="Number of seeds evaluated per task in brute force mode",
+        ),
+    ] = D5_DEFAULT_CHUNK_SIZE,
+    reverse: Annotated[
+        bool,
+        Option(
+            "--reverse",
+            help="Solve part 2 walking locations upwards through the inverted maps (not "
+            "compatible with --workers nor --progress)",
+        ),
+    ] = False,
+    progress: Annotated[
+        bool,
+        Option(
+            "--progress",
+            help="Report the seeds processed and the best location found while solving",
+        ),
+    ] = False,
 ) -> None:
     """Day five problems interface."""
 
@@ -292,12 +510,36 @@ def day5(
     LOG.info("Beginning Day 5 activity!")
     print(f"\tDay 5 input file is in: {file}")
 
+    if workers and part != 2:
+        raise BadParameter(
+            "Brute force workers only apply to part 2", param_hint="--workers"
+        )
+    if reverse and workers:
+        raise BadParameter(
+            "--reverse and --workers are mutually exclusive", param_hint="--reverse"
+        )
+    if reverse and progress:
+        raise BadParameter(
+            "--reverse does not report progress", param_hint="--progress"
+        )
+
     lines_to_process = load_input_file(file)
+    callback = report_day5_progress if progress else None
     loc = -1
     match part:
         case 1:
-            loc = d5_solve_part_1(lines_to_process)
+            loc = d5_solve_part_1(lines_to_process, callback)
             pprint(f"\t[bold green]Lowest location for initial seeds is {loc}\n")
+        case 2 if reverse:
+            try:
+                loc = d5_solve_part_2_reverse(lines_to_process)
+            except ValueError as err:
+                LOG.warning("Falling back to forward range propagation: {}", err)
+                loc = d5_solve_part_2(lines_to_process)
+        case 2 if workers:
+            loc = d5_solve_part_2_brute_force(
+                lines_to_process, workers, chunk_size, callback
+            )
         case 2:
-            loc = d5_solve_part_2(lines_to_process)
+            loc = d5_solve_part_2(lines_to_process, callback)
     pprint(f"\t[bold green]Lowest location for initial seeds is {loc}\n")
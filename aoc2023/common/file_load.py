@@ -10,6 +10,7 @@ Copyright (c) 2023 Andrés Ferreiro González
 See project license for more info
 """
 
+from collections.abc import Iterator
 from pathlib import Path
 
 from loguru import logger as LOG
@@ -41,3 +42,28 @@ def load_input_file(file: Path) -> list[str]:
         LOG.critical("IOError happened in file {}: ({})", str(file), err.args)
 
     return lines
+
+
+def iter_input_file(file: Path) -> Iterator[str]:
+    """Lazily reads an input file, yielding its lines (stripped) one at a time so the whole file is
+    never held in memory.
+
+    Args:
+        file (Path): Path to the file to be read.
+
+    Yields:
+        str: Processed lines.
+    """
+
+    try:
+        LOG.info("Streaming input file")
+        with file.open("r", encoding="UTF-8") as fd:
+            for line in fd:
+                yield line.strip()
+
+    except FileNotFoundError as err:
+        LOG.critical("File does not exist: {} ({})", str(file), err.args)
+    except PermissionError as err:
+        LOG.critical("Permission denied for file: {} ({})", str(file), err.args)
+    except IOError as err:
+        LOG.critical("IOError happened in file {}: ({})", str(file), err.args)
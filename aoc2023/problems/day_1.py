@@ -12,10 +12,15 @@ See project license for more info
 
 from __future__ import annotations
 
+from collections import OrderedDict, deque
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
 from typing import Literal
+from unicodedata import decimal
 
 from loguru import logger as LOG
-from regex import findall
 
 WORD_TO_DIGIT = {
     "one": "1",
@@ -29,10 +34,369 @@ WORD_TO_DIGIT = {
     "nine": "9",
 }
 
+DIGIT_TO_DIGIT = {str(digit): str(digit) for digit in range(10)}
+
+# Registry of the word-digit vocabularies available to the "alpha" mode (see 'register_vocabulary')
+VOCABULARIES = {
+    "english": WORD_TO_DIGIT,
+    "spanish": {
+        "uno": "1",
+        "dos": "2",
+        "tres": "3",
+        "cuatro": "4",
+        "cinco": "5",
+        "seis": "6",
+        "siete": "7",
+        "ocho": "8",
+        "nueve": "9",
+    },
+}
+
+# Maximum number of compiled vocabularies kept in memory
+VOCABULARY_CACHE_SIZE = 8
+
+# Every byte value except ASCII digits and line breaks, deleted in bulk by the bytes "digits" mode
+_NON_DIGIT_BYTES = bytes(
+    byte
+    for byte in range(256)
+    if not ord("0") <= byte <= ord("9") and byte not in b"\r\n"
+)
+
+# Turns carriage returns into line feeds, so old Mac line breaks still split lines
+_CR_TO_LF = bytes.maketrans(b"\r", b"\n")
+
+# Default maximum number of lines remembered by a 'LineCache'
+DEFAULT_LINE_CACHE_SIZE = 65536
+
+# Approximate size (in bytes) of the chunks processed by each task of the parallel mode
+DEFAULT_CHUNK_BYTES = 32 * 1024 * 1024
+
+
+class WordAutomaton:
+    """Aho-Corasick automaton over a set of words, compiled into a DFA (every state has a direct
+    transition for every character), so overlapping matches of all the words are found in a single
+    linear scan of the text, with no backtracking.
+
+    Matching is case insensitive.
+
+    Attributes:
+        max_length (int): Length of the longest word of the automaton.
+    """
+
+    def __init__(self, words: dict[str, str]):
+        """Builds a new automaton.
+
+        Args:
+            words (dict[str, str]): Words to be matched and the value reported for each of them.
+        """
+
+        goto = [{}]
+        outputs = [[]]
+        for word, value in words.items():
+            state = 0
+            for char in word.lower():
+                if char not in goto[state]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            outputs[state].append((len(word), value))
+
+        alphabet = {char for transitions in goto for char in transitions}
+        fail = [0] * len(goto)
+        delta = [{} for __ in goto]
+        queue = deque()
+        for char in alphabet:
+            delta[0][char] = goto[0].get(char, 0)
+            if delta[0][char]:
+                queue.append(delta[0][char])
+
+        # Breadth first, so the failure state of every state is completed before the state itself
+        while queue:
+            state = queue.popleft()
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            for char in alphabet:
+                if char in goto[state]:
+                    child = goto[state][char]
+                    fail[child] = delta[fail[state]][char]
+                    delta[state][char] = child
+                    queue.append(child)
+                else:
+                    delta[state][char] = delta[fail[state]][char]
+
+        self._delta = [
+            {
+                case_char: target
+                for char, target in transitions.items()
+                if target
+                for case_char in {char, char.upper()}
+            }
+            for transitions in delta
+        ]
+        self._outputs = outputs
+        self.max_length = max((len(word) for word in words), default=0)
+
+    def iter_matches(self, text: Iterable[str]) -> Iterator[tuple[int, str]]:
+        """Lazily yields every (possibly overlapping) match found in a text, in order of ending
+        position.
+
+        Args:
+            text (Iterable[str]): Text to be scanned (any iterable of characters).
+
+        Yields:
+            tuple[int, str]: Starting position of the match and value of the matched word.
+        """
+
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        for index, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            for length, value in outputs[state]:
+                yield index - length + 1, value
+
+    def first_match(self, text: Iterable[str]) -> tuple[int, str] | None:
+        """Finds the first word (by starting position) in a text, stopping the scan as soon as no
+        later match could start before the best one found.
+
+        Args:
+            text (Iterable[str]): Text to be scanned (any iterable of characters).
+
+        Returns:
+            tuple[int, str] | None: Starting position and value of the first word, or None if
+            there is none.
+        """
+
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        best = None
+        for index, char in enumerate(text):
+            # Matches ending from here on would start after the best one found so far
+            if best is not None and index >= best[0] + self.max_length - 1:
+                break
+
+            state = delta[state].get(char, 0)
+            for length, value in outputs[state]:
+                if best is None or index - length + 1 < best[0]:
+                    best = (index - length + 1, value)
+
+        return best
+
+
+class LineCache:
+    """Bounded LRU cache of per-line calibration values, for feeds with many repeated lines.
+
+    Attributes:
+        maxsize (int): Maximum number of entries. The least recently used entry is evicted when
+        it is exceeded.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that had to be computed.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_LINE_CACHE_SIZE):
+        """Creates a new empty cache.
+
+        Args:
+            maxsize (int, optional): Maximum number of entries. Defaults to
+            DEFAULT_LINE_CACHE_SIZE.
+        """
+
+        if maxsize < 1:
+            raise ValueError(f"Cache size must be positive, got {maxsize}")
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        """Ratio of lookups served from the cache (0 if there was none)."""
+
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get_or_compute(
+        self, key: Hashable, compute: Callable[[], int | None]
+    ) -> int | None:
+        """Gets the value stored for a key, computing and storing it on a miss.
+
+        Args:
+            key (Hashable): Cache key.
+            compute (Callable[[], int | None]): Function computing the value on a miss.
+
+        Returns:
+            int | None: Cached or computed value.
+        """
+
+        entries = self._entries
+        if key in entries:
+            self.hits += 1
+            entries.move_to_end(key)
+            return entries[key]
+
+        self.misses += 1
+        value = compute()
+        entries[key] = value
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+        return value
+
+
+def extract_calibration_value(
+    line: str, forward: WordAutomaton, backward: WordAutomaton
+) -> int | None:
+    """Computes the calibration value of a line (see 'extract_first_last').
+
+    Args:
+        line (str): Line to be scanned.
+        forward (WordAutomaton): Automaton over the words.
+        backward (WordAutomaton): Automaton over the reversed words.
+
+    Returns:
+        int | None: Calibration value of the line, or None if it has no digits.
+    """
+
+    found = extract_first_last(line, forward, backward)
+
+    return int(found[0] + found[1]) if found else None
+
+
+def extract_first_last(
+    line: str, forward: WordAutomaton, backward: WordAutomaton
+) -> tuple[str, str] | None:
+    """Extracts the values of the first and last words of a line, scanning forward from the start
+    until the first word is found and backward from the end until the last one is found, so the
+    middle of the line is never read when words are near both ends.
+
+    Non ASCII decimal digits count as digits too (see 'normalise_digits').
+
+    Args:
+        line (str): Line to be scanned.
+        forward (WordAutomaton): Automaton over the words.
+        backward (WordAutomaton): Automaton over the reversed words.
+
+    Returns:
+        tuple[str, str] | None: Values of the first and last words, or None if there is none.
+    """
+
+    line = normalise_digits(line)
+    first = forward.first_match(line)
+    if first is None:
+        return None
+
+    # The earliest match in the reversed line is the one with the latest start in the line
+    __, last_value = next(backward.iter_matches(reversed(line)))
+
+    return first[1], last_value
+
+
+def normalise_digits(line: str) -> str:
+    """Replaces the non ASCII decimal digits of a line (e.g. "٣") by their ASCII counterparts, so
+    the automata, which only know ASCII digits, still find them. Positions are kept, as every
+    character is replaced by exactly one character.
+
+    Args:
+        line (str): Line to be normalised.
+
+    Returns:
+        str: Normalised line, as long as the input one.
+    """
+
+    if line.isascii():
+        return line
+
+    return "".join(
+        str(decimal(char)) if not char.isascii() and char.isdecimal() else char
+        for char in line
+    )
+
+
+def split_lines(data: bytes) -> list[str]:
+    """Decodes a raw buffer and splits it into stripped lines at the same line breaks as the text
+    mode reads of 'load_input_file' ('str.splitlines' would also split on form feeds, unicode line
+    separators and so on).
+
+    Args:
+        data (bytes): UTF-8 encoded buffer.
+
+    Returns:
+        list[str]: Stripped lines of the buffer.
+    """
+
+    text = data.decode("UTF-8").replace("\r\n", "\n").replace("\r", "\n")
+
+    return [line.strip() for line in text.split("\n")]
+
+
+@lru_cache(maxsize=VOCABULARY_CACHE_SIZE)
+def build_word_matchers(
+    words: tuple[tuple[str, str], ...]
+) -> tuple[WordAutomaton, WordAutomaton]:
+    """Builds (once per word set) the forward and backward automata used by
+    'extract_first_last'. The least recently used word sets are evicted first.
+
+    Args:
+        words (tuple[tuple[str, str], ...]): Words and their values, as (word, value) pairs.
+
+    Returns:
+        tuple[WordAutomaton, WordAutomaton]: Automata over the words and over the reversed words.
+    """
+
+    reversed_words = tuple((word[::-1], value) for word, value in words)
+
+    return WordAutomaton(dict(words)), WordAutomaton(dict(reversed_words))
+
+
+def register_vocabulary(name: str, words: dict[str, str]) -> None:
+    """Registers (or replaces) a word-digit vocabulary for the "alpha" mode.
+
+    Args:
+        name (str): Name of the vocabulary (e.g. "spanish").
+        words (dict[str, str]): Spelled out digits and their values (e.g. {"uno": "1"}).
+
+    Raises:
+        ValueError: If any word is empty or any value is not a single digit.
+    """
+
+    for word, value in words.items():
+        if not word or value not in DIGIT_TO_DIGIT:
+            raise ValueError(f"Invalid vocabulary entry {word!r}: {value!r}")
+
+    LOG.debug("Registering vocabulary {} with {} words", name, len(words))
+    VOCABULARIES[name] = dict(words)
+
+
+def get_vocabulary_matchers(name: str) -> tuple[WordAutomaton, WordAutomaton]:
+    """Gets the compiled matchers (see 'build_word_matchers') of a registered vocabulary, plus the
+    digits themselves.
+
+    Args:
+        name (str): Name of the vocabulary.
+
+    Raises:
+        ValueError: If the vocabulary is not registered.
+
+    Returns:
+        tuple[WordAutomaton, WordAutomaton]: Automata over the words and over the reversed words.
+    """
+
+    if name not in VOCABULARIES:
+        raise ValueError(f"Unknown vocabulary {name}")
+
+    return build_word_matchers(tuple({**DIGIT_TO_DIGIT, **VOCABULARIES[name]}.items()))
+
 
 def compute_calibration_numbers(
     list_of_lines: list[str],
     pattern: Literal["digits"] | Literal["alpha"] = "digits",
+    vocabulary: str = "english",
+    cache: LineCache | None = None,
 ) -> tuple[list[int], int]:
     """Computes the calibration numbers needed by the elves.
 
@@ -41,7 +405,8 @@ def compute_calibration_numbers(
         digit (in that order) to form a single two-digit number.
     Mode "alpha":
         - Some of the digits are actually spelled out with letters: one, two, three, four, five,
-        six, seven, eight, and nine also count as valid "digits".
+        six, seven, eight, and nine also count as valid "digits". Other languages can be used
+        through registered vocabularies (see 'register_vocabulary').
 
     The additional checksum is simply the sum of all calibration values.
 
@@ -49,7 +414,10 @@ def compute_calibration_numbers(
         list_of_lines (list[str]): List of lines to be processed.
         pattern (Literal["digits"] | Literal["alpha"], optional): Flag indicating the computation
         mode for the calibration list. Defaults to "digits".
-
+        vocabulary (str, optional): Name of the vocabulary of spelled out digits used in "alpha"
+        mode. Defaults to "english".
+        cache (LineCache | None, optional): Cache of per-line values, keyed on line content, mode
+        and vocabulary. Defaults to None (no caching).
 
     Returns:
         Tuple[list[int], int]: List of calibration values and checksum of them.
@@ -61,37 +429,176 @@ def compute_calibration_numbers(
 
     match pattern:
         case "digits":
-            re_pattern = r"\d"
+            forward, backward = build_word_matchers(tuple(DIGIT_TO_DIGIT.items()))
         case "alpha":
-            word_set = [
-                "one",
-                "two",
-                "three",
-                "four",
-                "five",
-                "six",
-                "seven",
-                "eight",
-                "nine",
-            ]
-            re_pattern = r"(?i:\d|" + r"|".join(word_set) + r")"
+            forward, backward = get_vocabulary_matchers(vocabulary)
 
     for line in list_of_lines:
-        matches = findall(re_pattern, line, overlapped=True)
-        if matches:
-            n0 = (
-                matches[0]
-                if matches[0].isdigit()
-                else WORD_TO_DIGIT[matches[0].lower()]
-            )
-            n1 = (
-                matches[-1]
-                if matches[-1].isdigit()
-                else WORD_TO_DIGIT[matches[-1].lower()]
+        if cache is None:
+            value = extract_calibration_value(line, forward, backward)
+        else:
+            value = cache.get_or_compute(
+                (line, pattern, vocabulary),
+                lambda line=line: extract_calibration_value(line, forward, backward),
             )
+        if value is not None:
+            calibration_lines.append(value)
 
-            calibration_lines.append(int(n0 + n1))
+    if cache is not None:
+        LOG.info(
+            "Line cache: {} hits, {} misses ({} entries)",
+            cache.hits,
+            cache.misses,
+            len(cache),
+        )
 
     checksum = sum(calibration_lines)
 
     return calibration_lines, checksum
+
+
+def compute_digits_calibration_numbers(
+    buffer: bytes, keep_values: bool = True
+) -> tuple[list[int] | None, int]:
+    """Bytes based version of the "digits" mode of 'compute_calibration_numbers', working over a
+    whole file buffer at once.
+
+    Every byte but ASCII digits and line breaks is deleted in bulk with 'bytes.translate' (which
+    also turns carriage returns into line feeds), so every remaining line holds just the digits of
+    the original one and its first and last bytes are the calibration digits. Buffers holding non
+    ASCII characters, which may be decimal digits too, go through 'compute_calibration_numbers'
+    instead.
+
+    Args:
+        buffer (bytes): Raw contents of the input file.
+        keep_values (bool, optional): Whether to return the calibration value of every line too.
+        Defaults to True.
+
+    Returns:
+        tuple[list[int] | None, int]: List of calibration values (None unless 'keep_values') and
+        checksum of them.
+    """
+
+    if not buffer.isascii():
+        values, checksum = compute_calibration_numbers(split_lines(buffer))
+        return (values if keep_values else None), checksum
+
+    zero = ord("0")
+    lines = [
+        line
+        for line in buffer.translate(_CR_TO_LF, _NON_DIGIT_BYTES).split(b"\n")
+        if line
+    ]
+
+    if not keep_values:
+        checksum = 10 * sum(line[0] for line in lines) + sum(line[-1] for line in lines)
+        return None, checksum - 11 * zero * len(lines)
+
+    calibration_lines = [(line[0] - zero) * 10 + line[-1] - zero for line in lines]
+
+    return calibration_lines, sum(calibration_lines)
+
+
+def find_chunk_boundaries(file: Path, chunk_bytes: int) -> list[tuple[int, int]]:
+    """Splits a file into byte chunks of roughly 'chunk_bytes' bytes, extending each of them up to
+    the end of its last line so no line is split across chunks.
+
+    Args:
+        file (Path): Path to the file to be split.
+        chunk_bytes (int): Approximate size of each chunk.
+
+    Returns:
+        list[tuple[int, int]]: Start (inclusive) and end (exclusive) byte offsets of every chunk.
+    """
+
+    if chunk_bytes < 1:
+        raise ValueError(f"Chunk size must be positive, got {chunk_bytes}")
+
+    size = file.stat().st_size
+    boundaries = []
+    with file.open("rb") as fd:
+        start = 0
+        while start < size:
+            end = min(start + chunk_bytes, size)
+            if end < size:
+                fd.seek(end - 1)
+                end += len(fd.readline()) - 1
+            boundaries.append((start, end))
+            start = end
+
+    return boundaries
+
+
+def _compute_chunk_checksum(
+    task: tuple[Path, int, int, str, str, dict[str, str], bool]
+) -> tuple[list[int] | None, int]:
+    file, start, end, pattern, vocabulary, words, keep_values = task
+    with file.open("rb") as fd:
+        fd.seek(start)
+        data = fd.read(end - start)
+
+    if pattern == "digits":
+        return compute_digits_calibration_numbers(data, keep_values)
+
+    # Vocabularies are shipped with the task, as workers may not share the parent registry
+    if VOCABULARIES.get(vocabulary) != words:
+        register_vocabulary(vocabulary, words)
+
+    values, checksum = compute_calibration_numbers(
+        split_lines(data), pattern, vocabulary  # type: ignore
+    )
+
+    return (values if keep_values else None), checksum
+
+
+def compute_calibration_numbers_parallel(
+    file: Path,
+    pattern: Literal["digits"] | Literal["alpha"] = "digits",
+    workers: int | None = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    keep_values: bool = False,
+    vocabulary: str = "english",
+) -> tuple[list[int] | None, int]:
+    """Parallel version of 'compute_calibration_numbers' for big input files.
+
+    The file is split into newline aligned byte chunks (see 'find_chunk_boundaries') that a pool of
+    worker processes reads and reduces to partial checksums, which are then added up. Only chunk
+    offsets are sent to the workers.
+
+    Args:
+        file (Path): Path to the input file.
+        pattern (Literal["digits"] | Literal["alpha"], optional): Flag indicating the computation
+        mode for the calibration list. Defaults to "digits".
+        workers (int | None, optional): Number of worker processes. Defaults to None (as many as
+        CPUs).
+        chunk_bytes (int, optional): Approximate size of each chunk. Defaults to
+        DEFAULT_CHUNK_BYTES.
+        keep_values (bool, optional): Whether to return the calibration value of every line too,
+        which needs memory proportional to the input. Defaults to False.
+        vocabulary (str, optional): Name of the vocabulary of spelled out digits used in "alpha"
+        mode. Defaults to "english".
+
+    Returns:
+        tuple[list[int] | None, int]: List of calibration values (None unless 'keep_values') and
+        checksum of them.
+    """
+
+    if vocabulary not in VOCABULARIES:
+        raise ValueError(f"Unknown vocabulary {vocabulary}")
+
+    words = VOCABULARIES[vocabulary]
+    tasks = [
+        (file, start, end, pattern, vocabulary, words, keep_values)
+        for start, end in find_chunk_boundaries(file, chunk_bytes)
+    ]
+    LOG.info("Computing calibration values for {} chunks of {}", len(tasks), file)
+
+    calibration_lines = [] if keep_values else None
+    checksum = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for values, partial_checksum in executor.map(_compute_chunk_checksum, tasks):
+            checksum += partial_checksum
+            if calibration_lines is not None and values is not None:
+                calibration_lines.extend(values)
+
+    return calibration_lines, checksum
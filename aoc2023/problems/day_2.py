@@ -10,25 +10,123 @@ Copyright (c) 2023 Andrés Ferreiro González
 See project license for more info
 """
 
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from math import prod
+from operator import le
+from pathlib import Path
+
 from loguru import logger as LOG
+from regex import compile as regex_compile
+
+# Maximum number of colours of a 'ColourSchema'
+MAX_COLOURS = 16
+
+# Maximum number of cells of the prefix sums grid of a 'FeasibilityIndex'
+DEFAULT_MAX_INDEX_CELLS = 1 << 22
+
+
+class ColourSchema:
+    """Set of cube colours of a game log, with every colour name interned to a fixed index.
+
+    The tokeniser of the schema has a capturing group per colour, so the index of the colour of
+    every "<count> <colour>" item comes from the group that matched and no string comparison nor
+    dictionary lookup is performed per item.
+
+    Attributes:
+        colours (tuple[str, ...]): Colour names, in index order.
+        index (dict[str, int]): Index of every colour name.
+    """
+
+    __slots__ = ("colours", "index", "pattern")
+
+    def __init__(self, colours: tuple[str, ...]):
+        """Creates a new schema.
+
+        Args:
+            colours (tuple[str, ...]): Colour names, in index order.
+
+        Raises:
+            ValueError: If there are no colours, more than MAX_COLOURS, repeated ones or names that
+            are not single words.
+        """
+
+        colours = tuple(colours)
+        if not 0 < len(colours) <= MAX_COLOURS:
+            raise ValueError(f"A schema needs between 1 and {MAX_COLOURS} colours")
+        if len(set(colours)) != len(colours):
+            raise ValueError(f"Repeated colours in schema: {colours}")
+        if not all(colour.isalpha() for colour in colours):
+            raise ValueError(f"Colour names must be single words: {colours}")
+
+        self.colours = colours
+        self.index = {colour: index for index, colour in enumerate(colours)}
+        groups = "|".join(f"({colour})" for colour in colours)
+        self.pattern = regex_compile(rf"(\d+) (?:{groups})\b")
+
+    @classmethod
+    def from_string(cls, colours: str) -> ColourSchema:
+        """Builds a schema from a comma separated list of colour names (e.g. 'red,green,blue').
+
+        Args:
+            colours (str): Comma separated colour names.
+
+        Returns:
+            ColourSchema: Colour schema.
+        """
+
+        return cls(
+            tuple(colour.strip() for colour in colours.split(",") if colour.strip())
+        )
+
+    def __len__(self) -> int:
+        return len(self.colours)
+
+    def max_values(self, text: str) -> list[int]:
+        """Computes the maximum count of every colour among the items of a text.
+
+        Args:
+            text (str): Text holding "<count> <colour>" items.
+
+        Returns:
+            list[int]: Maximum count of every colour, in index order (0 for missing colours).
+        """
+
+        max_values = [0] * len(self.colours)
+        for match in self.pattern.finditer(text):
+            # Group 1 is the count, the colour groups follow in index order
+            index = match.lastindex - 2
+            n_balls = int(match.group(1))
+            if n_balls > max_values[index]:
+                max_values[index] = n_balls
 
+        return max_values
 
-def compute_min_values_per_game(list_of_games: list[str]) -> list[tuple[int, int, int]]:
+
+# Classic red, green and blue schema of the problem statement
+DEFAULT_SCHEMA = ColourSchema(("red", "green", "blue"))
+
+
+def compute_min_values_per_game(
+    list_of_games: list[str], schema: ColourSchema = DEFAULT_SCHEMA
+) -> list[tuple[int, ...]]:
     """This function computes the minimum values of each element needed for the game to be posible
     for a list of games encoded as strings (more info on the format in the 'split_game' function).
 
     Args:
         list_of_games (list[str]): List of game realizations, encoded as strings.
+        schema (ColourSchema, optional): Colours of the games. Defaults to DEFAULT_SCHEMA.
 
     Returns:
-        list[tuple[int, int, int]]: List of minimum elements of each type for a game to be posible,
+        list[tuple[int, ...]]: List of minimum elements of each type for a game to be posible,
         for every input game.
     """
 
     minimum_values_per_game = []
     for game in list_of_games:
-        game_id, game_sets = split_game(game)
-        min_values = get_min_posible_values_for_game(game_sets)
+        game_id, min_values = parse_game_max_values(game, schema)
         LOG.trace("Minimum values for game {} feasibility: {}", game_id, min_values)
         minimum_values_per_game.append(min_values)
 
@@ -36,15 +134,18 @@ def compute_min_values_per_game(list_of_games: list[str]) -> list[tuple[int, int
 
 
 def check_posible_games(
-    list_of_games: list[str], max_values: tuple[int, int, int]
+    list_of_games: list[str],
+    max_values: tuple[int, ...],
+    schema: ColourSchema = DEFAULT_SCHEMA,
 ) -> tuple[list[int], int]:
     """This functions takes a list of games encoded as strings (more info on the format in the
     'split_game' function) and checks if they are posible according to defined max values or not.
 
     Args:
         list_of_games (list[str]): List of game realizations, encoded as strings.
-        max_values (tuple[int, int, int]): List of max values of each cube type, as tuple(reds,
-        greens, blues).
+        max_values (tuple[int, ...]): List of max values of each cube type, in schema order (e.g.
+        (reds, greens, blues)).
+        schema (ColourSchema, optional): Colours of the games. Defaults to DEFAULT_SCHEMA.
 
     Returns:
         tuple[list[int], int]: List of posible games and sum of their IDs.
@@ -52,8 +153,8 @@ def check_posible_games(
 
     posible_games = []
     for game in list_of_games:
-        game_id, game_sets = split_game(game)
-        game_posible = is_game_posible(game_sets, max_values)
+        game_id, game_max_values = parse_game_max_values(game, schema)
+        game_posible = all(map(le, game_max_values, max_values))
         LOG.trace("Is game {} posible? -> {}", game_id, game_posible)
         if game_posible:
             posible_games.append(game_id)
@@ -61,7 +162,63 @@ def check_posible_games(
     return posible_games, sum(posible_games)
 
 
-def split_game(game: str) -> tuple[int, list[tuple[int, int, int]]]:
+def compute_game_checksums(
+    list_of_games: list[str],
+    max_values: tuple[int, ...],
+    schema: ColourSchema = DEFAULT_SCHEMA,
+) -> tuple[int, int]:
+    """Solves both problems in a single pass over a list of games encoded as strings (more info on
+    the format in the 'split_game' function).
+
+    Args:
+        list_of_games (list[str]): List of game realizations, encoded as strings.
+        max_values (tuple[int, ...]): List of max values of each cube type, in schema order (e.g.
+        (reds, greens, blues)).
+        schema (ColourSchema, optional): Colours of the games. Defaults to DEFAULT_SCHEMA.
+
+    Returns:
+        tuple[int, int]: Sum of the IDs of the posible games and sum of the powers of the minimum
+        values of every game.
+    """
+
+    ids_sum = 0
+    sum_of_powers = 0
+    for game in list_of_games:
+        game_id, values = parse_game_max_values(game, schema)
+        if all(map(le, values, max_values)):
+            ids_sum += game_id
+        sum_of_powers += prod(values)
+
+    return ids_sum, sum_of_powers
+
+
+def parse_game_max_values(
+    game: str, schema: ColourSchema = DEFAULT_SCHEMA
+) -> tuple[int, tuple[int, ...]]:
+    """Parses a game string (more info on the format in the 'split_game' function) straight into
+    its ID and the maximum number of cubes of each colour shown in any of its sets, in a single
+    tokenising pass and without building the list of sets.
+
+    The maximum values of a game are also the minimum values needed for it to be posible.
+
+    Args:
+        game (str): Game definition string.
+        schema (ColourSchema, optional): Colours of the game. Defaults to DEFAULT_SCHEMA.
+
+    Returns:
+        tuple[int, tuple[int, ...]]: Game ID and maximum values in schema order (e.g. (n_red,
+        n_green, n_blue)).
+    """
+
+    header, __, body = game.partition(":")
+    game_id = int(header.strip()[5:])
+
+    return game_id, tuple(schema.max_values(body))
+
+
+def split_game(
+    game: str, schema: ColourSchema = DEFAULT_SCHEMA
+) -> tuple[int, list[tuple[int, ...]]]:
     """Splits a game defined as a string with the format:
 
     'Game 1: 3 blue, 4 red; 1 red, 2 green, 6 blue; 2 green'
@@ -71,10 +228,11 @@ def split_game(game: str) -> tuple[int, list[tuple[int, int, int]]]:
 
     Args:
         game (str): Game definition string.
+        schema (ColourSchema, optional): Colours of the game. Defaults to DEFAULT_SCHEMA.
 
     Returns:
-        tuple[int, list[tuple[int, int, int]]]: Game ID and list of game sets as integers (n_red,
-        n_green, n_blue)
+        tuple[int, list[tuple[int, ...]]]: Game ID and list of game sets as integers in schema
+        order (e.g. (n_red, n_green, n_blue)).
     """
 
     game_tokens = game.split(":")
@@ -84,30 +242,13 @@ def split_game(game: str) -> tuple[int, list[tuple[int, int, int]]]:
 
     sets = game_tokens[1].strip().split(";")
 
-    game_sets = []
-    for set_i in sets:
-        items = set_i.strip().split(",")
-
-        red_n = 0
-        blue_n = 0
-        green_n = 0
-        for item in items:
-            parts = item.strip().split(" ")
-            n_balls = int(parts[0].strip())
-            match parts[1].strip():
-                case "red":
-                    red_n = n_balls
-                case "green":
-                    green_n = n_balls
-                case "blue":
-                    blue_n = n_balls
-        game_sets.append((red_n, green_n, blue_n))
+    game_sets = [tuple(schema.max_values(set_i)) for set_i in sets]
 
     return game_id, game_sets
 
 
 def is_game_posible(
-    game_sets: list[tuple[int, int, int]], max_values: tuple[int, int, int]
+    game_sets: list[tuple[int, ...]], max_values: tuple[int, ...]
 ) -> bool:
     """Checks whether a given game (defined by a list of tuples of realizations) is posible or not.
 
@@ -115,8 +256,8 @@ def is_game_posible(
     the bag for a game.
 
     Args:
-        game_sets (list[tuple[int, int, int]]): List of sets of a particular game.
-        max_values (tuple[int, int, int]): Number of cubes of each type (red, green, blue) stored
+        game_sets (list[tuple[int, ...]]): List of sets of a particular game.
+        max_values (tuple[int, ...]): Number of cubes of each type (e.g. red, green, blue) stored
         in the bag for the game.
 
     Returns:
@@ -132,39 +273,383 @@ def is_game_posible(
 
 
 def get_min_posible_values_for_game(
-    game_sets: list[tuple[int, int, int]]
-) -> tuple[int, int, int]:
+    game_sets: list[tuple[int, ...]]
+) -> tuple[int, ...]:
     """Computes the minimum values of each element needed for the game to be posible.
 
     Args:
-        game_sets (list[tuple[int, int, int]]): List of sets of a particular game.
+        game_sets (list[tuple[int, ...]]): List of sets of a particular game.
 
     Returns:
-        tuple[int, int, int]: Minimum number of elements of each type required for the game to be
-        valid, defined as (red, green, blue) tuple.
+        tuple[int, ...]: Minimum number of elements of each type required for the game to be
+        valid, in schema order (e.g. (red, green, blue) tuple).
     """
 
     LOG.trace("Computing minimum values for game")
 
-    min_red = max(game_sets, key=lambda x: x[0])[0]
-    min_green = max(game_sets, key=lambda x: x[1])[1]
-    min_blue = max(game_sets, key=lambda x: x[2])[2]
-
-    return (min_red, min_green, min_blue)
+    return tuple(map(max, zip(*game_sets)))
 
 
-def compute_sum_of_powers(values_per_game: list[tuple[int, int, int]]) -> int:
+def compute_sum_of_powers(values_per_game: list[tuple[int, ...]]) -> int:
     """Computes the sum of the powers of a group of game realizations. The power of a realization
-    is equal to the numbers of red, green, and blue multiplied together.
+    is equal to the numbers of cubes of every colour (e.g. red, green, and blue) multiplied
+    together.
 
     Args:
-        values_per_game (list[tuple[int, int, int]]): Elements of each type in a game realization.
+        values_per_game (list[tuple[int, ...]]): Elements of each type in a game realization.
 
     Returns:
         int: Sum of the products of the different types of cubes in a game.
     """
 
     LOG.trace("Computing sum of powers for group of game realizations")
-    sum_of_powers = sum([mv[0] * mv[1] * mv[2] for mv in values_per_game])
+    sum_of_powers = sum(map(prod, values_per_game))
 
     return sum_of_powers
+
+
+class GameStore:
+    """Columnar store of a game log, keeping for every game its ID and the maximum number of cubes
+    of each colour in contiguous arrays, so it is parsed once and then queried many times.
+
+    Attributes:
+        game_ids (array): IDs of the games.
+        columns (list[array]): Maximum number of cubes of each colour per game, in schema order.
+        schema (ColourSchema): Colours of the games.
+    """
+
+    def __init__(
+        self,
+        game_ids: array,
+        columns: list[array],
+        schema: ColourSchema = DEFAULT_SCHEMA,
+    ):
+        """Creates a new store.
+
+        Args:
+            game_ids (array): IDs of the games.
+            columns (list[array]): Maximum number of cubes of each colour per game.
+            schema (ColourSchema, optional): Colours of the games. Defaults to DEFAULT_SCHEMA.
+
+        Raises:
+            ValueError: If there is not a column per colour of the schema.
+        """
+
+        if len(columns) != len(schema):
+            raise ValueError(f"Expected {len(schema)} columns, got {len(columns)}")
+
+        self.game_ids = game_ids
+        self.columns = columns
+        self.schema = schema
+
+    @classmethod
+    def from_lines(
+        cls, list_of_games: list[str], schema: ColourSchema = DEFAULT_SCHEMA
+    ) -> GameStore:
+        """Builds the store from a list of games encoded as strings (more info on the format in the
+        'split_game' function).
+
+        Args:
+            list_of_games (list[str]): List of game realizations, encoded as strings.
+            schema (ColourSchema, optional): Colours of the games. Defaults to DEFAULT_SCHEMA.
+
+        Returns:
+            GameStore: Game store.
+        """
+
+        game_ids = array("q")
+        columns = [array("q") for __ in schema.colours]
+        for game in list_of_games:
+            game_id, max_values = parse_game_max_values(game, schema)
+            game_ids.append(game_id)
+            for column, value in zip(columns, max_values):
+                column.append(value)
+
+        return cls(game_ids, columns, schema)
+
+    def __len__(self) -> int:
+        return len(self.game_ids)
+
+    def posible_ids_sum(self, max_values: tuple[int, ...]) -> int:
+        """Computes the sum of the IDs of the games posible for a bag.
+
+        Args:
+            max_values (tuple[int, ...]): Number of cubes of each colour in the bag.
+
+        Returns:
+            int: Sum of the IDs of the posible games.
+        """
+
+        return sum(
+            game_id
+            for game_id, values in zip(self.game_ids, zip(*self.columns))
+            if all(map(le, values, max_values))
+        )
+
+    def posible_ids_sums(self, bags: list[tuple[int, ...]]) -> list[int]:
+        """Computes the sum of the IDs of the posible games for a batch of bags, in a single pass
+        over the store.
+
+        Args:
+            bags (list[tuple[int, ...]]): Number of cubes of each colour in every bag.
+
+        Returns:
+            list[int]: Sum of the IDs of the posible games for every bag.
+        """
+
+        sums = [0] * len(bags)
+        for game_id, values in zip(self.game_ids, zip(*self.columns)):
+            for index, bag in enumerate(bags):
+                if all(map(le, values, bag)):
+                    sums[index] += game_id
+
+        return sums
+
+    def sum_of_powers(self) -> int:
+        """Computes the sum of the powers of the minimum values of every game (see
+        'compute_sum_of_powers').
+
+        Returns:
+            int: Sum of the powers.
+        """
+
+        return sum(map(prod, zip(*self.columns)))
+
+
+class FeasibilityIndex:
+    """Dominance index over a game store answering "sum of the IDs of the games posible for a bag"
+    in O(colours * log(games)) per query, regardless of the number of games.
+
+    Every colour axis is compressed to the distinct maximum values found in the store, and the IDs
+    of the games are accumulated into a grid of prefix sums over those axes, so a query is one
+    bisect per colour followed by a single grid lookup. Build time and memory are proportional to
+    the grid size (product of the distinct values per colour).
+
+    Attributes:
+        axes (list[list[int]]): Sorted distinct maximum values of every colour.
+    """
+
+    def __init__(self, store: GameStore, max_cells: int = DEFAULT_MAX_INDEX_CELLS):
+        """Builds the index for a game store.
+
+        Args:
+            store (GameStore): Game store to be indexed.
+            max_cells (int, optional): Maximum size of the grid. Defaults to
+            DEFAULT_MAX_INDEX_CELLS.
+
+        Raises:
+            ValueError: If the grid would have more than 'max_cells' cells.
+        """
+
+        self.axes = [sorted(set(column)) for column in store.columns]
+        shape = [len(axis) for axis in self.axes]
+        size = prod(shape) if len(store) else 0
+        if size > max_cells:
+            raise ValueError(f"Index grid would have {size} cells (max {max_cells})")
+
+        strides = [prod(shape[dim + 1 :]) for dim in range(len(shape))]
+        positions = [
+            {value: pos for pos, value in enumerate(axis)} for axis in self.axes
+        ]
+
+        grid = [0] * size
+        for game_id, values in zip(store.game_ids, zip(*store.columns)):
+            cell = 0
+            for value, position, stride in zip(values, positions, strides):
+                cell += position[value] * stride
+            grid[cell] += game_id
+
+        # Prefix sums along every dimension, one at a time
+        for extent, stride in zip(shape, strides):
+            for cell in range(size):
+                if (cell // stride) % extent:
+                    grid[cell] += grid[cell - stride]
+
+        self._strides = strides
+        self._grid = grid
+
+    def posible_ids_sum(self, max_values: tuple[int, ...]) -> int:
+        """Computes the sum of the IDs of the games posible for a bag.
+
+        Args:
+            max_values (tuple[int, ...]): Number of cubes of each colour in the bag.
+
+        Returns:
+            int: Sum of the IDs of the posible games.
+        """
+
+        if not self._grid:
+            return 0
+
+        cell = 0
+        for axis, value, stride in zip(self.axes, max_values, self._strides):
+            position = bisect_right(axis, value) - 1
+            if position < 0:
+                return 0
+            cell += position * stride
+
+        return self._grid[cell]
+
+
+class GameAggregator:
+    """Stateful aggregator of an append-only game log, keeping running totals of both checksums so
+    every update only costs the new games.
+
+    The log can be fed either with raw chunks of bytes, where a trailing partial line is buffered
+    until its newline arrives, or by tailing a file from the byte offset reached by the previous
+    update.
+
+    Attributes:
+        max_values (tuple[int, ...]): Number of cubes of each colour in the bag.
+        schema (ColourSchema): Colours of the games.
+        offset (int): Number of bytes of the log already read.
+        n_games (int): Number of games ingested.
+        ids_sum (int): Sum of the IDs of the posible games ingested.
+        sum_of_powers (int): Sum of the powers of the minimum values of the games ingested.
+    """
+
+    def __init__(
+        self, max_values: tuple[int, ...], schema: ColourSchema = DEFAULT_SCHEMA
+    ):
+        """Creates a new, empty, aggregator.
+
+        Args:
+            max_values (tuple[int, ...]): Number of cubes of each colour in the bag.
+            schema (ColourSchema, optional): Colours of the games. Defaults to DEFAULT_SCHEMA.
+
+        Raises:
+            ValueError: If the bag does not define a number of cubes per colour.
+        """
+
+        if len(max_values) != len(schema):
+            raise ValueError(
+                f"Expected {len(schema)} max values, got {len(max_values)}"
+            )
+
+        self.max_values = tuple(max_values)
+        self.schema = schema
+        self.reset()
+
+    def reset(self) -> None:
+        """Drops every ingested game and rewinds the aggregator to the start of the log."""
+
+        self.offset = 0
+        self.n_games = 0
+        self.ids_sum = 0
+        self.sum_of_powers = 0
+        self._pending = b""
+
+    @property
+    def checksums(self) -> tuple[int, int]:
+        """Sum of the IDs of the posible games and sum of the powers, as in
+        'compute_game_checksums'."""
+
+        return self.ids_sum, self.sum_of_powers
+
+    def feed_lines(self, list_of_games: list[str]) -> int:
+        """Ingests complete game lines (more info on the format in the 'split_game' function).
+        Empty lines are skipped.
+
+        Args:
+            list_of_games (list[str]): List of game realizations, encoded as strings.
+
+        Returns:
+            int: Number of games ingested.
+        """
+
+        n_games = 0
+        for game in list_of_games:
+            if not game.strip():
+                continue
+            game_id, values = parse_game_max_values(game, self.schema)
+            if all(map(le, values, self.max_values)):
+                self.ids_sum += game_id
+            self.sum_of_powers += prod(values)
+            n_games += 1
+
+        self.n_games += n_games
+        return n_games
+
+    def feed(self, data: bytes) -> int:
+        """Ingests a chunk of the log, buffering its trailing partial line (if any) until the rest
+        of it is fed.
+
+        Args:
+            data (bytes): Chunk of the UTF-8 encoded log.
+
+        Returns:
+            int: Number of games ingested.
+        """
+
+        self.offset += len(data)
+        data = self._pending + data
+        complete, newline, self._pending = data.rpartition(b"\n")
+        if not newline:
+            return 0
+
+        return self.feed_lines(complete.decode("UTF-8").split("\n"))
+
+    def flush(self) -> int:
+        """Ingests the buffered partial line as a complete one, for logs whose last line does not
+        end with a newline.
+
+        Returns:
+            int: Number of games ingested.
+        """
+
+        pending, self._pending = self._pending, b""
+        return self.feed_lines([pending.decode("UTF-8")])
+
+    def update(self, file: Path) -> int:
+        """Ingests the games appended to a log file since the previous update. If the file is
+        shorter than the offset already read it is assumed to have been truncated or rotated, and
+        the aggregator is reset and re-reads it from the start.
+
+        Args:
+            file (Path): Path to the log file.
+
+        Returns:
+            int: Number of games ingested.
+        """
+
+        with file.open("rb") as fd:
+            size = fd.seek(0, 2)
+            if size < self.offset:
+                LOG.warning(
+                    "Log {} shrank below offset {}, resetting", file, self.offset
+                )
+                self.reset()
+            fd.seek(self.offset)
+            data = fd.read()
+
+        return self.feed(data)
+
+
+def parse_bag_configurations(
+    lines: list[str], schema: ColourSchema = DEFAULT_SCHEMA
+) -> list[tuple[int, ...]]:
+    """Parses bag configurations, one per line as the number of cubes of every colour of the schema
+    (e.g. red, green and blue) separated by spaces or commas (e.g. '12 13 14'). Empty lines and
+    lines starting with '#' are skipped.
+
+    Args:
+        lines (list[str]): Lines to be parsed.
+        schema (ColourSchema, optional): Colours of the bags. Defaults to DEFAULT_SCHEMA.
+
+    Raises:
+        ValueError: If a line does not hold an integer per colour.
+
+    Returns:
+        list[tuple[int, ...]]: Bag configurations.
+    """
+
+    bags = []
+    for line in lines:
+        if not line or line.startswith("#"):
+            continue
+        tokens = line.replace(",", " ").split()
+        if len(tokens) != len(schema) or not all(token.isdecimal() for token in tokens):
+            raise ValueError(f"Invalid bag configuration: {line}")
+        bags.append(tuple(map(int, tokens)))
+
+    return bags
@@ -11,20 +11,51 @@ See project license for more info
 """
 
 from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from collections import deque
+from collections.abc import Iterable, Iterator
 from functools import reduce
+from itertools import chain
+from unicodedata import decimal
+
 from loguru import logger as LOG
 from regex import compile as regex_compile
 
+# Matches every number of a row of the schematic, as bytes
+NUMBER_PATTERN = regex_compile(rb"\d+")
+
+# Byte standing for any non ASCII character that is not a digit (a symbol)
+NON_ASCII_SYMBOL = "#"
+
+# Translation table to the symbols mask: 1 for symbols, 0 for digits and dots
+SYMBOLS_TABLE = bytes(0 if chr(c) in "0123456789." else 1 for c in range(256))
+
+# Translation table to the binary digits ('1' for symbols) of the symbols mask of a row
+SYMBOL_BITS_TABLE = bytes(ord("0") + bit for bit in SYMBOLS_TABLE)
+
+# Strategies of 'find_part_numbers'
+PART_NUMBER_STRATEGIES = ("grid", "dilation")
+
+# Kinds of the values emitted by 'iter_parts_and_gears'
+PART_EVENT = "part"
+GEAR_EVENT = "gear"
+
 
 class Number:
     """Simple class that defines a number (multi-char) and its adjacent cells inside a matrix
     (text).
 
     Attributes:
+        row (int): Row of the number inside the matrix.
+        start (int): Starting position (col) of the number inside the matrix.
+        end (int): Ending position (exclusive) of the number inside the matrix.
         value (int): Number value.
-        box (set[tuple[int, int]]): Set of coordinates of the neighbouring cells.
     """
 
+    __slots__ = ("row", "start", "end", "value")
+
     def __init__(self, row: int, start: int, end: int, val: str):
         """Creates a new number instance.
 
@@ -35,12 +66,21 @@ class Number:
             val (str): Value of the number, string encoded.
         """
 
+        self.row = row
+        self.start = start
+        self.end = end
         self.value = int(val)
+
+    @property
+    def box(self) -> set[tuple[int, int]]:
+        """Set of coordinates of the neighbouring cells, computed on demand."""
+
+        row, start, end = self.row, self.start, self.end
         adj = {(row, start - 1), (row, end)}
         for c in range(start - 1, end + 1):
             adj.add((row + 1, c))
             adj.add((row - 1, c))
-        self.box = adj
+        return adj
 
 
 class Symbol:
@@ -51,6 +91,8 @@ class Symbol:
         position (tuple[int, int]): Coordinates of the symbol within the matrix.
     """
 
+    __slots__ = ("symb", "position")
+
     def __init__(self, symbol: str, row: int, col: int):
         """Creates a new symbol instance.
 
@@ -77,6 +119,8 @@ class Gear(Symbol):
         parts (list[int]): List of adjacent parts. It must have length 2 for the gear to be valid.
     """
 
+    __slots__ = ("parts",)
+
     def __init__(self, row: int, col: int, parts: list[int] | None = None):
         super().__init__("*", row, col)
         self.parts = parts if parts else []
@@ -86,6 +130,169 @@ class Gear(Symbol):
         return [gear for gear in gears if len(gear.parts) == 2]
 
 
+class Schematic:
+    """Compact, grid backed, representation of an engine schematic.
+
+    The cells are kept, one byte per character (see 'encode_row'), in a flat bytearray padded
+    with a border of dots, so the neighbours of any cell are reached by index arithmetic without
+    bound checks, next to a mask of the same layout flagging the symbols. Numbers are stored as
+    array backed (row, start, end, value) columns instead of one object per number.
+
+    Attributes:
+        height (int): Number of rows of the schematic.
+        width (int): Number of columns of the schematic.
+        stride (int): Length of a padded row of the grid (width + 2).
+        cells (bytearray): Padded grid of cells, row major.
+        symbols (bytearray): Padded grid flagging the symbols with 1.
+        rows (array): Row of every number.
+        starts (array): Starting column of every number.
+        ends (array): Ending column (exclusive) of every number.
+        values (array): Value of every number.
+    """
+
+    __slots__ = (
+        "height",
+        "width",
+        "stride",
+        "cells",
+        "symbols",
+        "rows",
+        "starts",
+        "ends",
+        "values",
+    )
+
+    def __init__(self, rows: list[str]):
+        """Builds the schematic from its rows. Shorter rows are padded with dots.
+
+        Args:
+            rows (list[str]): List of rows of the text matrix, string encoded.
+        """
+
+        self.height = len(rows)
+        self.width = max((len(row) for row in rows), default=0)
+        self.stride = stride = self.width + 2
+
+        self.cells = cells = bytearray(b"." * (stride * (self.height + 2)))
+        self.rows = array("q")
+        self.starts = array("q")
+        self.ends = array("q")
+        self.values = array("q")
+
+        for row, line in enumerate(rows):
+            encoded = encode_row(line)
+            offset = (row + 1) * stride + 1
+            cells[offset : offset + len(encoded)] = encoded
+            for m in NUMBER_PATTERN.finditer(encoded):
+                self.rows.append(row)
+                self.starts.append(m.start())
+                self.ends.append(m.end())
+                self.values.append(int(m.group()))
+
+        self.symbols = bytearray(cells.translate(SYMBOLS_TABLE))
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def _neighbour_spans(self, index: int) -> tuple[tuple[int, int], ...]:
+        """Computes the spans of the padded grid holding a number and its neighbouring cells.
+
+        Args:
+            index (int): Index of the number.
+
+        Returns:
+            tuple[tuple[int, int], ...]: (begin, end) spans of the rows above, at and below the
+            number.
+        """
+
+        # Padded coordinates of the upper left neighbour are (row, start), as (row + 1, col + 1)
+        begin = self.rows[index] * self.stride + self.starts[index]
+        end = begin + self.ends[index] - self.starts[index] + 2
+        return tuple(
+            (begin + shift, end + shift) for shift in (0, self.stride, 2 * self.stride)
+        )
+
+    def is_part(self, index: int) -> bool:
+        """Checks whether a number is adjacent to a symbol, even diagonally.
+
+        Args:
+            index (int): Index of the number.
+
+        Returns:
+            bool: Whether the number is a part number.
+        """
+
+        symbols = self.symbols
+        return any(
+            symbols.find(1, begin, end) >= 0
+            for begin, end in self._neighbour_spans(index)
+        )
+
+    def part_numbers(self) -> list[int]:
+        """Finds the part numbers of the schematic (see 'find_part_numbers').
+
+        Returns:
+            list[int]: List of valid part numbers.
+        """
+
+        return [value for index, value in enumerate(self.values) if self.is_part(index)]
+
+    def gears(self) -> list[Gear]:
+        """Finds the gears of the schematic (see 'find_gears').
+
+        Returns:
+            list[Gear]: List of valid gears, sorted by position.
+        """
+
+        cells, stride = self.cells, self.stride
+        adjacent_parts: dict[int, list[int]] = {}
+        for row, start, end, value in zip(
+            self.rows, self.starts, self.ends, self.values
+        ):
+            begin = row * stride + start
+            for shift in (0, stride, 2 * stride):
+                span_end = begin + shift + end - start + 2
+                cell = cells.find(42, begin + shift, span_end)  # '*'
+                while cell >= 0:
+                    adjacent_parts.setdefault(cell, []).append(value)
+                    cell = cells.find(42, cell + 1, span_end)
+
+        return Gear.filter_gears(
+            [
+                Gear(cell // self.stride - 1, cell % self.stride - 1, parts)
+                for cell, parts in sorted(adjacent_parts.items())
+            ]
+        )
+
+
+def encode_row(row: str) -> bytes:
+    """Encodes a row of a schematic into exactly one byte per character, so byte offsets are also
+    character columns. Non ASCII decimal digits are replaced by their ASCII counterparts and any
+    other non ASCII character by NON_ASCII_SYMBOL, as both are digits and symbols respectively for
+    'parse_lines'.
+
+    Args:
+        row (str): Row of the text matrix, string encoded.
+
+    Returns:
+        bytes: Encoded row, as long as the input one.
+    """
+
+    if row.isascii():
+        return row.encode("ascii")
+
+    cells = []
+    for char in row:
+        if char.isascii():
+            cells.append(char)
+        elif char.isdecimal():
+            cells.append(str(decimal(char)))
+        else:
+            cells.append(NON_ASCII_SYMBOL)
+
+    return "".join(cells).encode("ascii")
+
+
 def parse_lines(rows: list[str]) -> tuple[list[Number], list[Symbol]]:
     """Parses the input lines classifying symbols and numbers and tagging the neighbouring cells of
     the latter.
@@ -115,24 +322,82 @@ def parse_lines(rows: list[str]) -> tuple[list[Number], list[Symbol]]:
     return numbers, symbols
 
 
-def find_part_numbers(rows: list[str]) -> list[int]:
+def build_symbol_masks(rows: list[bytes]) -> list[int]:
+    """Builds the symbols mask of every row of a schematic, as an integer with the bit of every
+    column holding a symbol set (column 0 being the least significant bit).
+
+    Args:
+        rows (list[bytes]): List of rows of the text matrix, one byte per character (see
+        'encode_row').
+
+    Returns:
+        list[int]: Symbols mask of every row.
+    """
+
+    return [int(row.translate(SYMBOL_BITS_TABLE)[::-1] or b"0", 2) for row in rows]
+
+
+def dilate_masks(masks: list[int]) -> list[int]:
+    """Dilates the masks of a grid with a 3x3 neighbourhood, so every bit set spreads to its eight
+    neighbouring cells. Rows are dilated with shifts and then ORed with the rows above and below.
+
+    Args:
+        masks (list[int]): Mask of every row of the grid.
+
+    Returns:
+        list[int]: Dilated mask of every row.
+    """
+
+    horizontal = [mask | (mask << 1) | (mask >> 1) for mask in masks]
+    padded = [0, *horizontal, 0]
+
+    return [
+        padded[row] | padded[row + 1] | padded[row + 2] for row in range(len(masks))
+    ]
+
+
+def find_part_numbers(rows: list[str], strategy: str = "grid") -> list[int]:
     """This function tries to find suitable part numbers in a list of strings representing input
     lines.
 
     Any number adjacent to a symbol, even diagonally, is a "part number" and should be included,
     noting that dots does not count as symbols.
 
+    Two strategies are available:
+
+    - 'grid': neighbours of every number are checked in a 'Schematic' by index arithmetic.
+    - 'dilation': the symbols mask of the whole grid is dilated once with bitwise operations and
+      the span of every number is tested against it, with a cost that scales with the grid area.
+
     Args:
         rows (list[str]): List of input rows from the schematic.
+        strategy (str, optional): One of PART_NUMBER_STRATEGIES. Defaults to "grid".
+
+    Raises:
+        ValueError: If the strategy is unknown.
 
     Returns:
         list[int]: List of valid part numbers.
     """
 
-    parts, symbols = parse_lines(rows)
-    symbol_locations = set([symbol.position for symbol in symbols])
-    parts = [n.value for n in parts if symbol_locations & n.box]
-    return parts
+    match strategy:
+        case "grid":
+            return Schematic(rows).part_numbers()
+
+        case "dilation":
+            encoded = [encode_row(row) for row in rows]
+            dilated = dilate_masks(build_symbol_masks(encoded))
+            return [
+                int(m.group())
+                for mask, row in zip(dilated, encoded)
+                for m in NUMBER_PATTERN.finditer(row)
+                if (mask >> m.start()) & ((1 << (m.end() - m.start())) - 1)
+            ]
+
+        case _:
+            raise ValueError(
+                f"Unknown strategy '{strategy}', use one of {PART_NUMBER_STRATEGIES}"
+            )
 
 
 def compute_parts_sum(part_numbers: list[int]) -> int:
@@ -156,7 +421,8 @@ def find_gears(parts: list[Number], symbols: list[Symbol]) -> list[Gear]:
     A gear is defined as a '*' symbol with exactly two adjacent parts.
 
     The provided static method is useful for filtering a list of candidate gears ('*' symbols) and
-    ensuring the second condition is met.
+    ensuring the second condition is met. Candidate gears are indexed by position, so the cost is
+    linear in the total size of the boxes of the parts.
 
     Args:
         parts (list[Number]): List of input part numbers.
@@ -166,20 +432,19 @@ def find_gears(parts: list[Number], symbols: list[Symbol]) -> list[Gear]:
         list[Gear]: List of valid gears.
     """
 
-    candidate_gears = [
-        Gear(symbol.position[0], symbol.position[1])
+    # Candidate gears keyed by position, so every neighbouring cell is checked in O(1)
+    candidate_gears = {
+        symbol.position: Gear(symbol.position[0], symbol.position[1])
         for symbol in symbols
         if symbol.symb == "*"
-    ]
+    }
 
     for part in parts:
         for coords in part.box:
-            if gear := next(
-                (gear for gear in candidate_gears if gear.position == coords), None
-            ):
+            if gear := candidate_gears.get(coords):
                 gear.parts.append(part.value)
 
-    gears = Gear.filter_gears(candidate_gears)
+    gears = Gear.filter_gears(list(candidate_gears.values()))
 
     return gears
 
@@ -200,3 +465,82 @@ def compute_gear_ratios(gears: list[Gear]) -> list[int]:
         gear_ratios.append(ratio)
 
     return gear_ratios
+
+
+def _scan_row(row: str) -> tuple[bytes, bytes, list[int], list[int], list[int]]:
+    """Scans a row of a schematic for the streaming solver.
+
+    Args:
+        row (str): Row of the text matrix, string encoded.
+
+    Returns:
+        tuple[bytes, bytes, list[int], list[int], list[int]]: Encoded row (see 'encode_row'),
+        symbols mask of the row and starts, ends and values of its numbers.
+    """
+
+    encoded = encode_row(row)
+    starts, ends, values = [], [], []
+    for m in NUMBER_PATTERN.finditer(encoded):
+        starts.append(m.start())
+        ends.append(m.end())
+        values.append(int(m.group()))
+
+    return encoded, encoded.translate(SYMBOLS_TABLE), starts, ends, values
+
+
+def iter_parts_and_gears(rows: Iterable[str]) -> Iterator[tuple[str, int]]:
+    """Streams a schematic row by row, keeping only a window of three rows in memory, and emits its
+    part numbers and gear ratios as soon as they are determinable: those of a row are emitted once
+    the following row has been read.
+
+    Args:
+        rows (Iterable[str]): Rows of the text matrix, string encoded.
+
+    Yields:
+        tuple[str, int]: Kind of value (PART_EVENT or GEAR_EVENT) and the value itself (part
+        number or gear ratio), in row major order.
+    """
+
+    # Virtual empty rows above the first row and below the last one
+    window = deque([_scan_row("")], maxlen=3)
+    for row in chain(rows, ("",)):
+        window.append(_scan_row(row))
+        if len(window) < 3:
+            continue
+
+        encoded, __, starts, ends, values = window[1]
+
+        for start, end, value in zip(starts, ends, values):
+            begin = max(start - 1, 0)
+            if any(scanned[1].find(1, begin, end + 1) >= 0 for scanned in window):
+                yield PART_EVENT, value
+
+        col = encoded.find(42)  # '*'
+        while col >= 0:
+            parts = []
+            for __, __, row_starts, row_ends, row_values in window:
+                index = bisect_right(row_starts, col + 1) - 1
+                while index >= 0 and row_ends[index] >= col:
+                    parts.append(row_values[index])
+                    index -= 1
+            if len(parts) == 2:
+                yield GEAR_EVENT, parts[0] * parts[1]
+            col = encoded.find(42, col + 1)
+
+
+def solve_streaming(rows: Iterable[str]) -> tuple[int, int]:
+    """Solves both problems in a single streaming pass over the rows of a schematic (see
+    'iter_parts_and_gears'), in constant memory regardless of the number of rows.
+
+    Args:
+        rows (Iterable[str]): Rows of the text matrix, string encoded.
+
+    Returns:
+        tuple[int, int]: Sum of the part numbers and sum of the gear ratios.
+    """
+
+    checksums = {PART_EVENT: 0, GEAR_EVENT: 0}
+    for kind, value in iter_parts_and_gears(rows):
+        checksums[kind] += value
+
+    return checksums[PART_EVENT], checksums[GEAR_EVENT]
@@ -10,19 +10,49 @@ Copyright (c) 2023 Andrés Ferreiro González
 See project license for more info
 """
 
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property, lru_cache
+from itertools import accumulate, count
+from operator import itemgetter
+
 from regex import findall
 
+# Exclusive upper bound of the values handled by the almanac (fits in a signed 64 bits integer)
+ALMANAC_UPPER_BOUND = 2**63 - 1
+
+# Number of seeds evaluated by each task of the brute force solver
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+# Minimum number of seeds processed between two calls to the progress callback of the solvers
+DEFAULT_PROGRESS_EVERY = 1_000_000
+
+# Progress callback of the solvers, receiving the number of seeds processed and the best location
+ProgressCallback = Callable[[int, int], None]
+
+# Names of the almanac maps (stages), in almanac order
+STAGE_NAMES = (
+    "seed-to-soil",
+    "soil-to-fertilizer",
+    "fertilizer-to-water",
+    "water-to-light",
+    "light-to-temperature",
+    "temperature-to-humidity",
+    "humidity-to-location",
+)
+
+# Almanac index shipped once to each brute force worker process (see '_init_worker')
+_WORKER_ALMANAC: Almanac | None = None
+
 
 def initialize_dicts() -> dict[str, list[tuple[range, range]]]:
-    dicts = {
-        "seed-to-soil": [],
-        "soil-to-fertilizer": [],
-        "fertilizer-to-water": [],
-        "water-to-light": [],
-        "light-to-temperature": [],
-        "temperature-to-humidity": [],
-        "humidity-to-location": [],
-    }
+    dicts = {name: [] for name in STAGE_NAMES}
 
     return dicts
 
@@ -68,11 +98,637 @@ def find_location_for_initial_seed(
     return var
 
 
-def solve_part_1(raw_lines: list[str]) -> int:
+def build_stage_index(
+    entries: tuple[tuple[int, int, int], ...] | list[tuple[int, int, int]]
+) -> tuple[list[int], list[int], list[int]]:
+    """Normalises the entries of a single almanac map into sorted start, end and offset arrays.
+
+    The gaps between entries are filled with identity segments (offset 0), so the resulting
+    segments cover every value from 0 to 'ALMANAC_UPPER_BOUND' and any value can be located with a
+    single bisect over the starts.
+
+    Args:
+        entries (tuple[tuple[int, int, int], ...] | list[tuple[int, int, int]]): Map entries, as
+        (src_start, src_end, dst_start) tuples.
+
+    Returns:
+        tuple[list[int], list[int], list[int]]: Starts, ends and offsets of the segments.
+    """
+
+    starts = []
+    ends = []
+    offsets = []
+
+    cursor = 0
+    for src_start, src_end, dst_start in sorted(entries):
+        offset = dst_start - src_start
+
+        # Overlapping entries are resolved in favour of the one with the lowest source start
+        src_start = max(src_start, cursor)
+        if src_start >= src_end:
+            continue
+
+        if cursor < src_start:
+            starts.append(cursor)
+            ends.append(src_start)
+            offsets.append(0)
+
+        starts.append(src_start)
+        ends.append(src_end)
+        offsets.append(offset)
+        cursor = src_end
+
+    if cursor < ALMANAC_UPPER_BOUND:
+        starts.append(cursor)
+        ends.append(ALMANAC_UPPER_BOUND)
+        offsets.append(0)
+
+    return starts, ends, offsets
+
+
+class CompactAlmanac:
+    """Compact almanac representation, with the seeds and the entries of every map stored in
+    contiguous arrays of signed 64 bits integers instead of tuples of ranges.
+
+    Attributes:
+        seeds (array): Seeds line values.
+        src_starts (list[array]): Source start of the entries, one array per map.
+        lengths (list[array]): Length of the entries, one array per map.
+        dst_starts (list[array]): Destination start of the entries, one array per map.
+    """
+
+    __slots__ = ("seeds", "src_starts", "lengths", "dst_starts")
+
+    # Serialisation header: magic, number of seeds and number of stages (little endian)
+    _HEADER = struct.Struct("<4sQQ")
+    _MAGIC = b"AOC5"
+
+    def __init__(
+        self,
+        seeds: array,
+        src_starts: list[array],
+        lengths: list[array],
+        dst_starts: list[array],
+    ):
+        """Creates a new compact almanac.
+
+        Args:
+            seeds (array): Seeds line values.
+            src_starts (list[array]): Source start of the entries, one array per map.
+            lengths (list[array]): Length of the entries, one array per map.
+            dst_starts (list[array]): Destination start of the entries, one array per map.
+        """
+
+        self.seeds = seeds
+        self.src_starts = src_starts
+        self.lengths = lengths
+        self.dst_starts = dst_starts
+
+    @classmethod
+    def from_lines(cls, raw_lines: list[str]) -> CompactAlmanac:
+        """Parses the input lines straight into a compact almanac, with no intermediate ranges.
+
+        Args:
+            raw_lines (list[str]): List of raw input lines.
+
+        Returns:
+            CompactAlmanac: Compact almanac.
+        """
+
+        seeds = array("q", (int(seed) for seed in raw_lines[0].split(":")[1].split()))
+        src_starts = [array("q") for __ in STAGE_NAMES]
+        lengths = [array("q") for __ in STAGE_NAMES]
+        dst_starts = [array("q") for __ in STAGE_NAMES]
+
+        stage = -1
+        for row in raw_lines[1:]:
+            if not row:
+                continue
+            if row.endswith("map:"):
+                stage = STAGE_NAMES.index(row.split()[0])
+                continue
+
+            dst_start, src_start, length = row.split()
+            src_starts[stage].append(int(src_start))
+            lengths[stage].append(int(length))
+            dst_starts[stage].append(int(dst_start))
+
+        return cls(seeds, src_starts, lengths, dst_starts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> CompactAlmanac:
+        """Loads a compact almanac serialised with 'to_bytes'.
+
+        Args:
+            data (bytes): Serialised almanac.
+
+        Raises:
+            ValueError: If the data is not a serialised almanac or its size does not match the
+                one announced by its header.
+
+        Returns:
+            CompactAlmanac: Compact almanac.
+        """
+
+        if len(data) < cls._HEADER.size:
+            raise ValueError("Data is not a serialised almanac")
+
+        magic, n_seeds, n_stages = cls._HEADER.unpack_from(data)
+        if magic != cls._MAGIC:
+            raise ValueError("Data is not a serialised almanac")
+
+        view = memoryview(data)
+        offset = cls._HEADER.size
+        if len(data) < offset + 8 * n_stages:
+            raise ValueError("Serialised almanac is truncated")
+
+        counts = array("q")
+        counts.frombytes(view[offset : offset + 8 * n_stages])
+        offset += 8 * n_stages
+
+        def read_column(size: int) -> array:
+            nonlocal offset
+            column = array("q")
+            column.frombytes(view[offset : offset + 8 * size])
+            offset += 8 * size
+            if sys.byteorder == "big":
+                column.byteswap()
+            return column
+
+        if sys.byteorder == "big":
+            counts.byteswap()
+
+        expected_size = offset + 8 * (n_seeds + 3 * sum(counts))
+        if len(data) != expected_size:
+            raise ValueError(
+                f"Serialised almanac holds {len(data)} bytes, expected {expected_size}"
+            )
+
+        seeds = read_column(n_seeds)
+        src_starts, lengths, dst_starts = [], [], []
+        for size in counts:
+            src_starts.append(read_column(size))
+            lengths.append(read_column(size))
+            dst_starts.append(read_column(size))
+
+        return cls(seeds, src_starts, lengths, dst_starts)
+
+    def to_bytes(self) -> bytes:
+        """Serialises the almanac as a header followed by the raw contents of every column (little
+        endian).
+
+        Returns:
+            bytes: Serialised almanac.
+        """
+
+        columns = [array("q", (len(column) for column in self.src_starts)), self.seeds]
+        for stage in range(len(self.src_starts)):
+            columns += [
+                self.src_starts[stage],
+                self.lengths[stage],
+                self.dst_starts[stage],
+            ]
+
+        chunks = [self._HEADER.pack(self._MAGIC, len(self.seeds), len(self.src_starts))]
+        for column in columns:
+            if sys.byteorder == "big":
+                column = array("q", column)
+                column.byteswap()
+            chunks.append(column.tobytes())
+
+        return b"".join(chunks)
+
+    def find_location(self, seed: int) -> int:
+        """Finds the location of a single seed, scanning the columns of every map.
+
+        Args:
+            seed (int): Initial seed.
+
+        Returns:
+            int: Location for the seed.
+        """
+
+        var = seed
+        for src_starts, lengths, dst_starts in zip(
+            self.src_starts, self.lengths, self.dst_starts
+        ):
+            for src_start, length, dst_start in zip(src_starts, lengths, dst_starts):
+                if src_start <= var < src_start + length:
+                    var += dst_start - src_start
+                    break
+
+        return var
+
+    def to_almanac(self) -> Almanac:
+        """Builds the almanac index (see 'Almanac') from the compact representation.
+
+        Returns:
+            Almanac: Almanac index.
+        """
+
+        return Almanac(
+            [
+                build_stage_index(
+                    [
+                        (src_start, src_start + length, dst_start)
+                        for src_start, length, dst_start in zip(*columns)
+                    ]
+                )
+                for columns in zip(self.src_starts, self.lengths, self.dst_starts)
+            ]
+        )
+
+
+class Almanac:
+    """Index over the almanac maps, with every map normalised into sorted and gap-filled segments
+    (see 'build_stage_index'), so each stage of a lookup is a single bisect.
+
+    Attributes:
+        stages (list[tuple[list[int], list[int], list[int]]]): Starts, ends and offsets of the
+        segments of each map, in almanac order.
+    """
+
+    def __init__(self, stages: list[tuple[list[int], list[int], list[int]]]):
+        """Creates a new almanac index.
+
+        Args:
+            stages (list[tuple[list[int], list[int], list[int]]]): Normalised segments of each map,
+            as returned by 'build_stage_index'.
+        """
+
+        self.stages = stages
+
+    @classmethod
+    def from_maps(cls, maps: dict[str, list[tuple[range, range]]]) -> Almanac:
+        """Builds the index from the almanac maps.
+
+        Args:
+            maps (dict[str, list[tuple[range, range]]]): Almanac maps, as returned by
+            'parse_lines'.
+
+        Returns:
+            Almanac: Almanac index.
+        """
+
+        return cls([build_stage_index(entries) for entries in freeze_maps(maps)])
+
+    def find_location(self, seed: int) -> int:
+        """Finds the location of a single seed.
+
+        Args:
+            seed (int): Initial seed.
+
+        Returns:
+            int: Location for the seed.
+        """
+
+        var = seed
+        for starts, __, offsets in self.stages:
+            if not 0 <= var < ALMANAC_UPPER_BOUND:
+                raise ValueError(f"Value {var} out of almanac bounds")
+            var += offsets[bisect_right(starts, var) - 1]
+
+        return var
+
+    def inverted(self) -> Almanac:
+        """Builds the inverse index (location to seed), with the stages in reverse order and every
+        stage mapping destination values back to source values. The inverse stages are normalised
+        with 'build_stage_index', same as the forward ones.
+
+        Raises:
+            ValueError: If any stage maps two source values onto the same destination value.
+
+        Returns:
+            Almanac: Inverse almanac index.
+        """
+
+        stages = []
+        for starts, ends, offsets in reversed(self.stages):
+            entries = sorted(
+                (start + offset, end + offset, start)
+                for start, end, offset in zip(starts, ends, offsets)
+            )
+            for previous, current in zip(entries, entries[1:]):
+                if current[0] < previous[1]:
+                    raise ValueError("Almanac stage is not invertible")
+            if entries[-1][1] > ALMANAC_UPPER_BOUND:
+                raise ValueError("Almanac stage is not invertible")
+
+            stages.append(build_stage_index(entries))
+
+        return Almanac(stages)
+
+    def sweep(self, sorted_values: list[int], stage: int) -> list[list[int]]:
+        """Maps a sorted list of values through a stage with a single merge-join pass over the
+        values and the segments of the stage. Every change of segment is a bisect over the
+        remaining segments, so the cost is O(values + segments hit * log(segments)).
+
+        Values falling in the same segment share the offset, so they are returned as one run that
+        is still sorted, and every run can be swept through the next stage on its own.
+
+        Args:
+            sorted_values (list[int]): Values to be mapped, sorted in ascending order.
+            stage (int): Index of the stage (map) to map the values with.
+
+        Returns:
+            list[list[int]]: Sorted runs of mapped values, one per segment hit.
+        """
+
+        if not sorted_values:
+            return []
+        if sorted_values[0] < 0 or sorted_values[-1] >= ALMANAC_UPPER_BOUND:
+            raise ValueError("Values out of almanac bounds")
+
+        starts, ends, offsets = self.stages[stage]
+
+        runs = []
+        index = bisect_right(starts, sorted_values[0]) - 1
+        end = ends[index]
+        offset = offsets[index]
+        run = []
+        for value in sorted_values:
+            if value >= end:
+                # Skip straight to the segment holding the value, however many it jumps over
+                index = bisect_right(starts, value, index + 1) - 1
+                end = ends[index]
+                offset = offsets[index]
+                runs.append(run)
+                run = []
+            run.append(value + offset)
+        runs.append(run)
+
+        return runs
+
+    def find_lowest_location_for_seeds(self, seeds: list[int]) -> int:
+        """Finds the lowest location for a (potentially huge) list of seeds in batch mode.
+
+        The seeds are sorted once and swept through every stage (see 'sweep'). The sorted runs of
+        a stage are carried forward and swept one by one through the next stage, without merging
+        them. Every run produced by a stage costs one bisect, so a stage costs
+        O(values + runs * log(segments)) with 'runs' counting its output runs. The lowest location
+        is the lowest head among the runs of the last stage.
+
+        Args:
+            seeds (list[int]): Initial seeds.
+
+        Returns:
+            int: Lowest location for the seeds.
+        """
+
+        runs = [sorted(seeds)]
+        for stage in range(len(self.stages)):
+            runs = [mapped for run in runs for mapped in self.sweep(run, stage)]
+
+        return min(run[0] for run in runs)
+
+    def split_range(self, value_range: range, stage: int) -> list[tuple[range, int]]:
+        """Splits a range of values at the segment boundaries of a stage.
+
+        Args:
+            value_range (range): Range of values to be split.
+            stage (int): Index of the stage (map) to split the range with.
+
+        Returns:
+            list[tuple[range, int]]: Non-empty pieces of the input range, sorted, and their offsets.
+        """
+
+        if not value_range:
+            return []
+        if value_range.start < 0 or value_range.stop > ALMANAC_UPPER_BOUND:
+            raise ValueError(f"Range {value_range} out of almanac bounds")
+
+        starts, ends, offsets = self.stages[stage]
+
+        pieces = []
+        low = value_range.start
+        index = bisect_right(starts, low) - 1
+        while low < value_range.stop:
+            high = min(value_range.stop, ends[index])
+            pieces.append((range(low, high), offsets[index]))
+            low = high
+            index += 1
+
+        return pieces
+
+    def map_ranges(self, value_ranges: list[range], stage: int) -> list[range]:
+        """Pushes whole ranges of values through a single stage of the almanac.
+
+        Args:
+            value_ranges (list[range]): Input ranges of values.
+            stage (int): Index of the stage (map) to push the ranges through.
+
+        Returns:
+            list[range]: Image of the input ranges through the stage.
+        """
+
+        return [
+            range(piece.start + offset, piece.stop + offset)
+            for value_range in value_ranges
+            for piece, offset in self.split_range(value_range, stage)
+        ]
+
+    def propagate(self, value_ranges: list[range]) -> list[range]:
+        """Pushes whole ranges of seeds through every stage of the almanac.
+
+        Args:
+            value_ranges (list[range]): Ranges of initial seeds.
+
+        Returns:
+            list[range]: Ranges of locations for the input seeds.
+        """
+
+        ranges = value_ranges
+        for stage in range(len(self.stages)):
+            ranges = self.map_ranges(ranges, stage)
+
+        return ranges
+
+    def find_lowest_location(self, seed_ranges: list[range]) -> int:
+        """Finds the lowest location reachable from a list of seed ranges.
+
+        Args:
+            seed_ranges (list[range]): Ranges of initial seeds.
+
+        Returns:
+            int: Lowest location for the seed ranges.
+        """
+
+        return min(
+            location_range.start for location_range in self.propagate(seed_ranges)
+        )
+
+    @cached_property
+    def composed_table(self) -> tuple[tuple[int, int, int], ...]:
+        """Composition of every stage into a single table of (src_start, src_end, offset)
+        segments (see 'compose_maps'). It is computed once per index."""
+
+        segments = [(0, ALMANAC_UPPER_BOUND, 0)]
+        for stage in range(len(self.stages)):
+            composed = []
+            for start, end, offset in segments:
+                image = range(start + offset, end + offset)
+                for piece, extra in self.split_range(image, stage):
+                    composed.append(
+                        (piece.start - offset, piece.stop - offset, offset + extra)
+                    )
+            segments = sorted(composed)
+
+        merged = [segments[0]]
+        for start, end, offset in segments[1:]:
+            last_start, last_end, last_offset = merged[-1]
+            if last_end == start and last_offset == offset:
+                merged[-1] = (last_start, end, offset)
+            else:
+                merged.append((start, end, offset))
+
+        return tuple(merged)
+
+
+def iter_locations(almanac: Almanac, seeds: Iterable[int]) -> Iterator[int]:
+    """Lazily yields the location of every seed of an iterable.
+
+    Args:
+        almanac (Almanac): Almanac index.
+        seeds (Iterable[int]): Initial seeds.
+
+    Yields:
+        int: Location for each seed.
+    """
+
+    find_location = almanac.find_location
+    for seed in seeds:
+        yield find_location(seed)
+
+
+def fold_min(
+    batches: Iterable[tuple[int, int]],
+    progress: ProgressCallback | None = None,
+    every: int = DEFAULT_PROGRESS_EVERY,
+) -> int:
+    """Folds a stream of (number of seeds, lowest location among them) batches into a running
+    minimum, using constant memory.
+
+    Args:
+        batches (Iterable[tuple[int, int]]): Stream of batches of seeds already reduced.
+        progress (ProgressCallback | None, optional): Callback receiving the number of seeds
+        processed and the best location so far. It is called every 'every' seeds (at batch
+        granularity) and once at the end. Defaults to None.
+        every (int, optional): Seeds between progress reports. Defaults to DEFAULT_PROGRESS_EVERY.
+
+    Raises:
+        ValueError: If the stream is empty.
+
+    Returns:
+        int: Lowest location of the stream.
+    """
+
+    best = None
+    processed = 0
+    next_report = every
+    for n_seeds, location in batches:
+        processed += n_seeds
+        if best is None or location < best:
+            best = location
+        if progress and processed >= next_report:
+            progress(processed, best)
+            next_report = processed + every
+
+    if best is None:
+        raise ValueError("No seeds to search for")
+    if progress and processed > next_report - every:
+        progress(processed, best)
+
+    return best
+
+
+def generate_lookup_source(
+    table: tuple[tuple[int, int, int], ...], name: str = "find_location"
+) -> str:
+    """Generates the Python source of a lookup function for a composed table (see
+    'compose_maps'), as a balanced if/else decision tree over the segment boundaries with the
+    offsets inlined in every leaf.
+
+    Args:
+        table (tuple[tuple[int, int, int], ...]): Composed table of segments.
+        name (str, optional): Name of the generated function. Defaults to "find_location".
+
+    Returns:
+        str: Source code of the lookup function.
+    """
+
+    lines = [
+        f"def {name}(seed):",
+        f"    if not 0 <= seed < {ALMANAC_UPPER_BOUND}:",
+        '        raise ValueError(f"Value {seed} out of almanac bounds")',
+    ]
+
+    def add_node(low: int, high: int, depth: int) -> None:
+        indent = "    " * depth
+        if high - low == 1:
+            offset = table[low][2]
+            sign = "-" if offset < 0 else "+"
+            lines.append(
+                f"{indent}return seed {sign} {abs(offset)}"
+                if offset
+                else f"{indent}return seed"
+            )
+            return
+
+        middle = (low + high) // 2
+        lines.append(f"{indent}if seed < {table[middle][0]}:")
+        add_node(low, middle, depth + 1)
+        lines.append(f"{indent}else:")
+        add_node(middle, high, depth + 1)
+
+    add_node(0, len(table), 1)
+
+    return "\n".join(lines) + "\n"
+
+
+@lru_cache(maxsize=16)
+def _compile_table(table: tuple[tuple[int, int, int], ...]) -> Callable[[int], int]:
+    namespace = {}
+    code = compile(generate_lookup_source(table), "<almanac>", "exec")
+    exec(code, namespace)  # nosec B102 (source generated from integers only)
+
+    return namespace["find_location"]
+
+
+def compile_almanac(almanac: Almanac) -> Callable[[int], int]:
+    """Compiles an almanac into a Python function that returns the location of a seed (see
+    'generate_lookup_source'). Compiled functions are cached per almanac content.
+
+    Args:
+        almanac (Almanac): Almanac index.
+
+    Returns:
+        Callable[[int], int]: Compiled lookup function.
+    """
+
+    return _compile_table(almanac.composed_table)
+
+
+def solve_part_1(raw_lines: list[str], progress: ProgressCallback | None = None) -> int:
+    """Solves the first problem.
+
+    Seeds are swept through the almanac in batch mode, unless a progress callback is given, in
+    which case they are streamed one by one so the running best location can be reported.
+
+    Args:
+        raw_lines (list[str]): List of raw input lines.
+        progress (ProgressCallback | None, optional): Progress callback. Defaults to None.
+
+    Returns:
+        int: Lowest location for the initial seeds.
+    """
+
     seeds, maps = parse_lines(raw_lines)
-    locations = [find_location_for_initial_seed(seed, maps) for seed in seeds]
+    almanac = Almanac.from_maps(maps)
+
+    if progress is None:
+        return almanac.find_lowest_location_for_seeds(seeds)
 
-    return min(locations)
+    return fold_min(((1, loc) for loc in iter_locations(almanac, seeds)), progress)
 
 
 def expand_seeds_list(input_list: list[int]) -> list[range]:
@@ -83,14 +739,311 @@ def expand_seeds_list(input_list: list[int]) -> list[range]:
     return expanded_list
 
 
-def solve_part_2(raw_lines: list[str]) -> int:
+def freeze_maps(
+    maps: dict[str, list[tuple[range, range]]]
+) -> tuple[tuple[tuple[int, int, int], ...], ...]:
+    """Converts the almanac maps into an immutable (hashable) structure, with one tuple of
+    (src_start, src_end, dst_start) entries per map, in almanac order.
+
+    Args:
+        maps (dict[str, list[tuple[range, range]]]): Almanac maps, as returned by 'parse_lines'.
+
+    Returns:
+        tuple[tuple[tuple[int, int, int], ...], ...]: Frozen almanac maps.
+    """
+
+    return tuple(
+        tuple((src.start, src.stop, dst.start) for src, dst in mp)
+        for mp in maps.values()
+    )
+
+
+@lru_cache(maxsize=16)
+def _compose_frozen_maps(
+    frozen_maps: tuple[tuple[tuple[int, int, int], ...], ...]
+) -> tuple[tuple[int, int, int], ...]:
+    almanac = Almanac([build_stage_index(entries) for entries in frozen_maps])
+
+    return almanac.composed_table
+
+
+def compose_maps(
+    maps: dict[str, list[tuple[range, range]]]
+) -> tuple[tuple[int, int, int], ...]:
+    """Composes the chain of almanac maps (seed-to-soil through humidity-to-location) into a single
+    piecewise-linear function.
+
+    The result is a sorted table of (src_start, src_end, offset) segments covering every seed from 0
+    to 'ALMANAC_UPPER_BOUND', so that a seed in [src_start, src_end) lands at seed + offset. Tables
+    are cached, so solving both parts (or repeated queries) over the same almanac composes it once.
+
+    Args:
+        maps (dict[str, list[tuple[range, range]]]): Almanac maps, as returned by 'parse_lines'.
+
+    Returns:
+        tuple[tuple[int, int, int], ...]: Composed table of segments.
+    """
+
+    return _compose_frozen_maps(freeze_maps(maps))
+
+
+def find_location_in_composed_table(
+    seed: int, table: tuple[tuple[int, int, int], ...]
+) -> int:
+    """Finds the location of a seed using a composed table (see 'compose_maps').
+
+    Args:
+        seed (int): Initial seed.
+        table (tuple[tuple[int, int, int], ...]): Composed table of segments.
+
+    Returns:
+        int: Location for the seed.
+    """
+
+    index = bisect_right(table, seed, key=itemgetter(0)) - 1
+    if index < 0 or seed >= table[index][1]:
+        return seed
+
+    return seed + table[index][2]
+
+
+def solve_part_2(raw_lines: list[str], progress: ProgressCallback | None = None) -> int:
+    """Solves the second problem, propagating the seed ranges one at a time through the almanac.
+
+    Args:
+        raw_lines (list[str]): List of raw input lines.
+        progress (ProgressCallback | None, optional): Progress callback. Defaults to None.
+
+    Returns:
+        int: Lowest location for the seed ranges.
+    """
+
     seeds_base, maps = parse_lines(raw_lines)
     seed_ranges = expand_seeds_list(seeds_base)
+    almanac = Almanac.from_maps(maps)
+
+    batches = (
+        (len(seed_range), almanac.find_lowest_location([seed_range]))
+        for seed_range in seed_ranges
+        if seed_range
+    )
+
+    return fold_min(batches, progress)
+
 
-    locations = []
-    for seed_range in seed_ranges:
-        locations.extend(
-            [find_location_for_initial_seed(seed, maps) for seed in seed_range]
+def split_seed_ranges(seed_ranges: list[range], chunk_size: int) -> list[range]:
+    """Splits ranges of seeds into subranges of, at most, 'chunk_size' seeds.
+
+    Args:
+        seed_ranges (list[range]): Ranges of initial seeds.
+        chunk_size (int): Maximum number of seeds per subrange.
+
+    Returns:
+        list[range]: List of subranges.
+    """
+
+    if chunk_size < 1:
+        raise ValueError(f"Chunk size must be positive, got {chunk_size}")
+
+    return [
+        range(start, min(start + chunk_size, seed_range.stop))
+        for seed_range in seed_ranges
+        for start in range(seed_range.start, seed_range.stop, chunk_size)
+    ]
+
+
+def _init_worker(almanac: Almanac) -> None:
+    global _WORKER_ALMANAC  # pylint: disable=global-statement
+    _WORKER_ALMANAC = almanac
+
+
+def _find_lowest_location_in_chunk(chunk: tuple[int, int]) -> int:
+    find_location = _WORKER_ALMANAC.find_location  # type: ignore (set by _init_worker)
+
+    return min(find_location(seed) for seed in range(*chunk))
+
+
+def solve_part_2_brute_force(
+    raw_lines: list[str],
+    workers: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: ProgressCallback | None = None,
+) -> int:
+    """Solves the second problem by evaluating every single seed, which provides a verifiable
+    answer for the analytic solver.
+
+    Seed ranges are split into chunks that are evaluated by a pool of worker processes, each one
+    reducing its chunk to a local minimum. The almanac index is shipped once to every worker when
+    the pool starts, so tasks only carry the chunk bounds.
+
+    Args:
+        raw_lines (list[str]): List of raw input lines.
+        workers (int): Number of worker processes.
+        chunk_size (int, optional): Number of seeds per task. Defaults to DEFAULT_CHUNK_SIZE.
+        progress (ProgressCallback | None, optional): Progress callback. Defaults to None.
+
+    Returns:
+        int: Lowest location for the seed ranges.
+    """
+
+    seeds_base, maps = parse_lines(raw_lines)
+    chunks = [
+        (chunk.start, chunk.stop)
+        for chunk in split_seed_ranges(expand_seeds_list(seeds_base), chunk_size)
+    ]
+    almanac = Almanac.from_maps(maps)
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(almanac,)
+    ) as executor:
+        local_minimums = executor.map(_find_lowest_location_in_chunk, chunks)
+        batches = (
+            (stop - start, location)
+            for (start, stop), location in zip(chunks, local_minimums)
+        )
+
+        return fold_min(batches, progress)
+
+
+def find_lowest_location_reverse(
+    almanac: Almanac, seed_ranges: list[range], limit: int | None = None
+) -> int:
+    """Finds the lowest location reachable from a list of seed ranges by walking the locations
+    upwards through the inverse almanac (see 'Almanac.inverted'), stopping at the first one whose
+    seed falls into any of the seed ranges. This is cheap when the answer is a small location.
+
+    Args:
+        almanac (Almanac): Almanac index.
+        seed_ranges (list[range]): Ranges of initial seeds.
+        limit (int | None, optional): Exclusive upper bound for the walked locations. Defaults to
+        None (no limit).
+
+    Raises:
+        ValueError: If no location is found below the limit.
+
+    Returns:
+        int: Lowest location for the seed ranges.
+    """
+
+    ranges = sorted((rng.start, rng.stop) for rng in seed_ranges if rng)
+    if not ranges:
+        raise ValueError("No seeds to search for")
+
+    starts = [start for start, __ in ranges]
+    stops = list(accumulate((stop for __, stop in ranges), max))
+
+    find_seed = almanac.inverted().find_location
+    locations = count() if limit is None else range(limit)
+    for location in locations:
+        seed = find_seed(location)
+        index = bisect_right(starts, seed) - 1
+        if index >= 0 and seed < stops[index]:
+            return location
+
+    raise ValueError(f"No location found below {limit}")
+
+
+def solve_part_2_reverse(raw_lines: list[str], limit: int | None = None) -> int:
+    seeds_base, maps = parse_lines(raw_lines)
+    seed_ranges = expand_seeds_list(seeds_base)
+
+    return find_lowest_location_reverse(Almanac.from_maps(maps), seed_ranges, limit)
+
+
+def merge_ranges(value_ranges: list[range]) -> list[range]:
+    """Sorts a list of ranges and merges the overlapping or adjacent ones.
+
+    Args:
+        value_ranges (list[range]): Input ranges.
+
+    Returns:
+        list[range]: Sorted, disjoint and non-adjacent ranges covering the same values.
+    """
+
+    merged = []
+    for value_range in sorted(value_ranges, key=lambda rng: rng.start):
+        if not value_range:
+            continue
+        if merged and value_range.start <= merged[-1].stop:
+            last = merged[-1]
+            merged[-1] = range(last.start, max(last.stop, value_range.stop))
+        else:
+            merged.append(value_range)
+
+    return merged
+
+
+class AlmanacSession:
+    """What-if session over an almanac and a fixed list of seed ranges.
+
+    The image of the seed ranges after every stage is cached, so when the entries of a map are
+    updated only that stage and the ones downstream of it are recomputed.
+
+    Attributes:
+        almanac (Almanac): Almanac index of the session.
+        images (list[list[range]]): Seed ranges followed by their image after every stage.
+    """
+
+    def __init__(self, seed_ranges: list[range], almanac: Almanac):
+        """Creates a new session, propagating the seed ranges through every stage.
+
+        Args:
+            seed_ranges (list[range]): Ranges of initial seeds.
+            almanac (Almanac): Almanac index. It is copied, so updates do not modify it.
+        """
+
+        self.almanac = Almanac(list(almanac.stages))
+        self.images = [merge_ranges(seed_ranges)]
+        self._propagate_from(0)
+
+    @classmethod
+    def from_lines(cls, raw_lines: list[str]) -> AlmanacSession:
+        """Creates a new session from the input lines, with the seeds line read as ranges (as in
+        the second problem).
+
+        Args:
+            raw_lines (list[str]): List of raw input lines.
+
+        Returns:
+            AlmanacSession: New session.
+        """
+
+        seeds_base, maps = parse_lines(raw_lines)
+
+        return cls(expand_seeds_list(seeds_base), Almanac.from_maps(maps))
+
+    @property
+    def lowest_location(self) -> int:
+        """Lowest location reachable from the seed ranges."""
+
+        return min(location_range.start for location_range in self.images[-1])
+
+    def update_stage(self, name: str, entries: list[tuple[range, range]]) -> int:
+        """Replaces the entries of a map and recomputes the stages from that one downstream. The
+        session gets a new almanac index holding the updated map.
+
+        Args:
+            name (str): Name of the map, as in 'STAGE_NAMES' (e.g. "water-to-light").
+            entries (list[tuple[range, range]]): New map entries, as (source, destination) ranges.
+
+        Returns:
+            int: New lowest location reachable from the seed ranges.
+        """
+
+        stage = STAGE_NAMES.index(name)
+        stages = list(self.almanac.stages)
+        stages[stage] = build_stage_index(
+            [(src.start, src.stop, dst.start) for src, dst in entries]
         )
+        # A new index, so cached derived data (e.g. 'composed_table') is never stale
+        self.almanac = Almanac(stages)
+        self._propagate_from(stage)
+
+        return self.lowest_location
 
-    return min(locations)
+    def _propagate_from(self, stage: int) -> None:
+        del self.images[stage + 1 :]
+        for index in range(stage, len(self.almanac.stages)):
+            self.images.append(
+                merge_ranges(self.almanac.map_ranges(self.images[index], index))
+            )
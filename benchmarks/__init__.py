@@ -0,0 +1,11 @@
+"""
+__init__.py
+
+Project: Advent of Code 2023
+
+Maintainer Andrés Ferreiro González (andres.ferreiro.glez@gmail.com)
+Created @ 18/10/26 10:12:41.305000
+
+Copyright (c) 2023 Andrés Ferreiro González
+See project license for more info
+"""
@@ -0,0 +1,70 @@
+"""
+bench_day_1.py
+
+Project: Advent of Code 2023
+
+Maintainer Andrés Ferreiro González (andres.ferreiro.glez@gmail.com)
+Created @ 18/10/26 12:40:27.904000
+
+Copyright (c) 2023 Andrés Ferreiro González
+See project license for more info
+
+Throughput benchmark of the day 1 "digits" mode over synthetic calibration data. Run it with:
+
+    python -m benchmarks.bench_day_1 [size in MB]
+"""
+
+import sys
+from random import Random
+from string import ascii_lowercase, digits
+from time import perf_counter
+
+from aoc2023.problems.day_1 import (
+    compute_calibration_numbers,
+    compute_digits_calibration_numbers,
+)
+
+
+def generate_calibration_data(size_mb: float, seed: int = 2023) -> bytes:
+    rng = Random(seed)
+    alphabet = ascii_lowercase * 3 + digits
+    line_pool = [
+        "".join(rng.choices(alphabet, k=rng.randint(20, 80))) + rng.choice(digits)
+        for __ in range(5000)
+    ]
+
+    lines = []
+    size = 0
+    while size < size_mb * 1024 * 1024:
+        line = rng.choice(line_pool)
+        lines.append(line)
+        size += len(line) + 1
+
+    return ("\n".join(lines) + "\n").encode("UTF-8")
+
+
+def main(size_mb: float) -> None:
+    buffer = generate_calibration_data(size_mb)
+    megabytes = len(buffer) / (1024 * 1024)
+
+    def lines_path() -> int:
+        lines = [line.strip() for line in buffer.decode("UTF-8").splitlines()]
+        return compute_calibration_numbers(lines, "digits")[1]
+
+    def bytes_path() -> int:
+        return compute_digits_calibration_numbers(buffer, keep_values=False)[1]
+
+    print(f"Processing {megabytes:.1f} MB of calibration data")
+    reference = None
+    for name, candidate in (("lines (automaton)", lines_path), ("bytes", bytes_path)):
+        start = perf_counter()
+        checksum = candidate()
+        elapsed = perf_counter() - start
+
+        reference = checksum if reference is None else reference
+        assert checksum == reference, name
+        print(f"  {name:<20} {megabytes / elapsed:10.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 32.0)
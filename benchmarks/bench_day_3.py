@@ -0,0 +1,126 @@
+"""
+bench_day_3.py
+
+Project: Advent of Code 2023
+
+Maintainer Andrés Ferreiro González (andres.ferreiro.glez@gmail.com)
+Created @ 18/10/26 15:12:48.362000
+
+Copyright (c) 2023 Andrés Ferreiro González
+See project license for more info
+
+Scaling benchmark of the day 3 gear detection over synthetic square schematics of increasing
+size, followed by a comparison of the part numbers strategies over wide schematics. Run it with:
+
+    python -m benchmarks.bench_day_3 [side of the largest schematic]
+"""
+
+import sys
+from random import Random
+from time import perf_counter
+
+from aoc2023.problems.day_3 import (
+    PART_NUMBER_STRATEGIES,
+    Gear,
+    Number,
+    Schematic,
+    Symbol,
+    compute_gear_ratios,
+    find_gears,
+    find_part_numbers,
+    parse_lines,
+)
+
+# Largest side for which the linear scan of the candidate gears is still timed
+MAX_LINEAR_SCAN_SIDE = 280
+
+
+def generate_schematic(side: int, seed: int = 2023, width: int = 0) -> list[str]:
+    rng = Random(seed)
+    width = width or side
+    rows = []
+    for __ in range(side):
+        row = []
+        while len(row) < width:
+            roll = rng.random()
+            if roll < 0.12:
+                row.extend(str(rng.randint(1, 999)))
+            elif roll < 0.16:
+                row.append(rng.choice("*****#+$/"))
+            else:
+                row.append(".")
+            row.append(".")
+        rows.append("".join(row[:width]))
+
+    return rows
+
+
+def find_gears_linear_scan(parts: list[Number], symbols: list[Symbol]) -> list[Gear]:
+    candidate_gears = [
+        Gear(symbol.position[0], symbol.position[1])
+        for symbol in symbols
+        if symbol.symb == "*"
+    ]
+
+    for part in parts:
+        for coords in part.box:
+            if gear := next(
+                (gear for gear in candidate_gears if gear.position == coords), None
+            ):
+                gear.parts.append(part.value)
+
+    return Gear.filter_gears(candidate_gears)
+
+
+def main(max_side: int) -> None:
+    print(
+        f"{'side':>6} {'parts':>8} {'symbols':>8} {'linear scan':>12} {'indexed':>12} "
+        f"{'grid':>12}"
+    )
+    side = 35
+    while side <= max_side:
+        rows = generate_schematic(side)
+        parts, symbols = parse_lines(rows)
+
+        start = perf_counter()
+        checksum = sum(compute_gear_ratios(find_gears(parts, symbols)))
+        indexed = perf_counter() - start
+
+        start = perf_counter()
+        assert sum(compute_gear_ratios(Schematic(rows).gears())) == checksum
+        grid = perf_counter() - start
+
+        linear = "-"
+        if side <= MAX_LINEAR_SCAN_SIDE:
+            start = perf_counter()
+            gears = find_gears_linear_scan(parts, symbols)
+            linear = f"{(perf_counter() - start) * 1e3:10.1f}ms"
+            assert sum(compute_gear_ratios(gears)) == checksum
+
+        print(
+            f"{side:>6} {len(parts):>8} {len(symbols):>8} {linear:>12} "
+            f"{indexed * 1e3:10.1f}ms {grid * 1e3:10.1f}ms"
+        )
+        side *= 2
+
+    print(
+        f"\n{'width':>8} " + " ".join(f"{name:>12}" for name in PART_NUMBER_STRATEGIES)
+    )
+    width = 1000
+    while width <= max_side * 8:
+        rows = generate_schematic(140, width=width)
+        timings = []
+        reference = None
+        for strategy in PART_NUMBER_STRATEGIES:
+            start = perf_counter()
+            part_numbers = find_part_numbers(rows, strategy)
+            timings.append(f"{(perf_counter() - start) * 1e3:10.1f}ms")
+            reference = part_numbers if reference is None else reference
+            assert part_numbers == reference, strategy
+
+        print(f"{width:>8} " + " ".join(f"{timing:>12}" for timing in timings))
+        width *= 4
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2240)
@@ -0,0 +1,65 @@
+"""
+bench_day_5.py
+
+Project: Advent of Code 2023
+
+Maintainer Andrés Ferreiro González (andres.ferreiro.glez@gmail.com)
+Created @ 18/10/26 10:14:02.118000
+
+Copyright (c) 2023 Andrés Ferreiro González
+See project license for more info
+
+Microbenchmark of the day 5 seed lookups. Run it with:
+
+    python -m benchmarks.bench_day_5 [input file] [number of seeds]
+"""
+
+import sys
+from pathlib import Path
+from random import Random
+from timeit import timeit
+
+from aoc2023.common.file_load import load_input_file
+from aoc2023.problems.day_5 import (
+    Almanac,
+    compile_almanac,
+    compose_maps,
+    find_location_for_initial_seed,
+    find_location_in_composed_table,
+    parse_lines,
+)
+
+
+def main(file: Path, n_seeds: int) -> None:
+    seeds, maps = parse_lines(load_input_file(file))
+    almanac = Almanac.from_maps(maps)
+    table = compose_maps(maps)
+    compiled = compile_almanac(almanac)
+
+    rng = Random(2023)
+    upper = max(seeds) * 2
+    queries = [rng.randrange(0, upper) for __ in range(n_seeds)]
+
+    candidates = {
+        "interpreted (range lists)": lambda s: find_location_for_initial_seed(s, maps),
+        "almanac index (bisect per map)": almanac.find_location,
+        "composed table (single bisect)": lambda s: find_location_in_composed_table(
+            s, table
+        ),
+        "compiled decision tree": compiled,
+    }
+
+    reference = [find_location_for_initial_seed(s, maps) for s in queries]
+    print(f"Looking up {n_seeds} seeds ({len(table)} composed segments)")
+    for name, lookup in candidates.items():
+        assert [lookup(s) for s in queries] == reference, name
+        elapsed = timeit(lambda lookup=lookup: [lookup(s) for s in queries], number=5)
+        per_seed_ns = elapsed / (5 * n_seeds) * 1e9
+        print(f"  {name:<32} {per_seed_ns:10.1f} ns/seed")
+
+
+if __name__ == "__main__":
+    main(
+        Path(sys.argv[1]) if len(sys.argv) > 1 else Path("data/inputs/input_d5.txt"),
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100_000,
+    )
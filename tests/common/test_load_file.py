@@ -12,7 +12,7 @@ See project license for more info
 
 from pathlib import Path
 
-from aoc2023.common.file_load import load_input_file
+from aoc2023.common.file_load import iter_input_file, load_input_file
 
 
 def test_load_input_file_exist() -> None:
@@ -43,3 +43,22 @@ def test_load_input_file_nonexistent() -> None:
 
     # Checks
     assert len(expected) == 0
+
+
+def test_iter_input_file() -> None:
+    """Checks that a given input file can be streamed line by line, and that a nonexistent one
+    yields no lines."""
+
+    # Inputs
+    in_file = Path("data/inputs/input_demo_loadfile.txt")
+
+    # Expected outputs
+    expected_lines = ["1abc2", "pqr3stu8vwx", "a1b2c3d4e5f", "treb7uchet"]
+
+    # Element Under Test (EUT)
+    lines = iter_input_file(in_file)
+
+    # Checks
+    assert next(lines) == expected_lines[0]
+    assert list(lines) == expected_lines[1:]
+    assert list(iter_input_file(Path("data/inputs/input_demo_loadfile_fake.txt"))) == []
@@ -10,8 +10,26 @@ Copyright (c) 2023 Andrés Ferreiro González
 See project license for more info
 """
 
+from pathlib import Path
 
-from aoc2023.problems.day_1 import compute_calibration_numbers
+import pytest
+
+from aoc2023.common.file_load import load_input_file
+from aoc2023.problems import day_1
+from aoc2023.problems.day_1 import (
+    WORD_TO_DIGIT,
+    LineCache,
+    WordAutomaton,
+    build_word_matchers,
+    compute_calibration_numbers,
+    compute_calibration_numbers_parallel,
+    compute_digits_calibration_numbers,
+    extract_first_last,
+    find_chunk_boundaries,
+    get_vocabulary_matchers,
+    normalise_digits,
+    register_vocabulary,
+)
 
 
 def test_day_1_calibration_report() -> None:
@@ -78,3 +96,271 @@ def test_day_1_calibration_report_alphanumeric() -> None:
     assert len(computed_list) == len(expected_values)
     assert computed_list == expected_values
     assert computed_checksum == expected_checksum
+
+
+def test_day_1_calibration_report_unicode_digits() -> None:
+    """Test that non ASCII decimal digits count as digits in every mode."""
+
+    # Inputs
+    in_data = ["٣x677cx0IFtw٣", "a٧bthree"]
+
+    # Expected outputs
+    expected_digits_values = [33, 77]
+    expected_alpha_values = [33, 73]
+
+    # Element Under Test (EUT)
+    computed_digits_values, __ = compute_calibration_numbers(in_data)
+    computed_alpha_values, __ = compute_calibration_numbers(in_data, "alpha")
+    computed_bytes_values, computed_bytes_checksum = compute_digits_calibration_numbers(
+        "\n".join(in_data).encode("UTF-8")
+    )
+
+    # Checks
+    assert computed_digits_values == expected_digits_values
+    assert computed_alpha_values == expected_alpha_values
+    assert computed_bytes_values == expected_digits_values
+    assert computed_bytes_checksum == sum(expected_digits_values)
+    assert normalise_digits("٣x677cx0IFtw٣") == "3x677cx0IFtw3"
+
+
+def test_word_automaton_overlapping_matches() -> None:
+    """Test that the automaton finds every overlapping match in a single scan."""
+
+    # Inputs
+    automaton = WordAutomaton({**WORD_TO_DIGIT, "1": "1"})
+    in_text = "xtwone1eighthree"
+
+    # Expected outputs
+    expected_matches = [(1, "2"), (3, "1"), (6, "1"), (7, "8"), (11, "3")]
+
+    # Element Under Test (EUT)
+    computed_matches = list(automaton.iter_matches(in_text))
+
+    # Checks
+    assert computed_matches == expected_matches
+    assert automaton.max_length == 5
+
+
+def test_word_automaton_first_match_ignore_case() -> None:
+    """Test the search of the first word of a text, ignoring case."""
+
+    # Inputs
+    automaton = WordAutomaton({**WORD_TO_DIGIT, "abcd": "0", "bc": "9"})
+
+    # Element Under Test (EUT) & Checks
+    assert automaton.first_match("zONEight") == (1, "1")
+    assert automaton.first_match("xABcd") == (1, "0")
+    assert automaton.first_match("nothing") is None
+
+
+def test_build_word_matchers_cached() -> None:
+    """Test that automata are only built once per word set."""
+
+    # Inputs
+    words = tuple(WORD_TO_DIGIT.items())
+
+    # Element Under Test (EUT)
+    computed_matchers = build_word_matchers(words)
+
+    # Checks
+    assert build_word_matchers(tuple(WORD_TO_DIGIT.items())) is computed_matchers
+
+
+def test_word_automaton_first_match_early_exit() -> None:
+    """Test that the forward search stops reading the text once the first word is known."""
+
+    # Inputs
+    automaton = WordAutomaton({**WORD_TO_DIGIT, "abcd": "0", "bc": "9"})
+    in_text = iter("xabcd" + "seven" * 1000)
+
+    # Expected outputs
+    expected_match = (1, "0")
+
+    # Element Under Test (EUT)
+    computed_match = automaton.first_match(in_text)
+
+    # Checks
+    assert computed_match == expected_match
+    assert len(list(in_text)) > 4990
+
+
+def test_extract_first_last() -> None:
+    """Test the bidirectional extraction of the first and last words of a line."""
+
+    # Inputs
+    forward, backward = build_word_matchers(tuple({**WORD_TO_DIGIT, "7": "7"}.items()))
+
+    # Element Under Test (EUT) & Checks
+    assert extract_first_last("xtwone3fourx", forward, backward) == ("2", "4")
+    assert extract_first_last("7pqrstsixteen", forward, backward) == ("7", "6")
+    assert extract_first_last("twoneight", forward, backward) == ("2", "8")
+    assert extract_first_last("nothing", forward, backward) is None
+
+
+def test_find_chunk_boundaries(tmp_path: Path) -> None:
+    """Test that chunks are aligned to line endings."""
+
+    # Inputs
+    in_file = tmp_path / "input.txt"
+    in_file.write_bytes(b"1abc2\npqr3stu8vwx\na1b2c3d4e5f\ntreb7uchet")
+
+    # Expected outputs
+    expected_boundaries = [(0, 6), (6, 18), (18, 30), (30, 40)]
+
+    # Element Under Test (EUT)
+    computed_boundaries = find_chunk_boundaries(in_file, 4)
+
+    # Checks
+    assert computed_boundaries == expected_boundaries
+
+
+def test_compute_calibration_numbers_parallel(tmp_path: Path) -> None:
+    """Test the parallel computation of the calibration checksum over file chunks."""
+
+    # Inputs
+    in_data = ["two1nine", "eightwothree", "abcone2threexyz", "xtwone3four"] * 50
+    in_file = tmp_path / "input.txt"
+    in_file.write_text("\n".join(in_data) + "\n", encoding="UTF-8")
+
+    # Expected outputs
+    expected_values, expected_checksum = compute_calibration_numbers(in_data, "alpha")
+
+    # Element Under Test (EUT)
+    computed_values, computed_checksum = compute_calibration_numbers_parallel(
+        in_file, "alpha", workers=2, chunk_bytes=100, keep_values=True
+    )
+    __, computed_checksum_only = compute_calibration_numbers_parallel(
+        in_file, "alpha", workers=2, chunk_bytes=100
+    )
+
+    # Checks
+    assert computed_values == expected_values
+    assert computed_checksum == expected_checksum
+    assert computed_checksum_only == expected_checksum
+
+
+def test_compute_calibration_numbers_parallel_line_breaks(tmp_path: Path) -> None:
+    """Test that the parallel computation only splits lines where the serial one does."""
+
+    # Inputs
+    in_file = tmp_path / "input.txt"
+    in_file.write_text("1a\x0cb2\nthree\u2028x4\n", encoding="UTF-8")
+
+    # Expected outputs
+    expected_values = [12, 34]
+    expected_checksum = 46
+
+    # Element Under Test (EUT)
+    computed_values, computed_checksum = compute_calibration_numbers_parallel(
+        in_file, "alpha", workers=1, keep_values=True
+    )
+
+    # Checks
+    assert computed_values == expected_values
+    assert computed_checksum == expected_checksum
+    assert compute_calibration_numbers(load_input_file(in_file), "alpha") == (
+        computed_values,
+        computed_checksum,
+    )
+
+
+def test_compute_digits_calibration_numbers() -> None:
+    """Test the bytes based computation of the first problem of AoC's 1st day."""
+
+    # Inputs
+    in_data = b"1abc2\r\npqr3stu8vwx\n\nnodigits\na1b2c3d4e5f\ntreb7uchet\n33fkrl1"
+
+    # Expected outputs
+    expected_values = [12, 38, 15, 77, 31]
+    expected_checksum = 173
+
+    # Element Under Test (EUT)
+    computed_list, computed_checksum = compute_digits_calibration_numbers(in_data)
+    __, computed_checksum_only = compute_digits_calibration_numbers(in_data, False)
+
+    # Checks
+    assert computed_list == expected_values
+    assert computed_checksum == expected_checksum
+    assert computed_checksum_only == expected_checksum
+    assert compute_digits_calibration_numbers(b"1ab\r2cd3\r") == ([11, 23], 34)
+    assert compute_digits_calibration_numbers(b"1ab\r2cd3\r", False)[1] == 34
+
+
+def test_day_1_calibration_report_spanish() -> None:
+    """Test the second problem of AoC's 1st day with the spanish vocabulary."""
+
+    # Inputs
+    in_data = ["dos1nueve", "ochodostres", "abcuno2tresxyz", "xdosuno3cuatro", "7siete"]
+
+    # Expected outputs
+    expected_values = [29, 83, 13, 24, 77]
+
+    # Element Under Test (EUT)
+    computed_list, __ = compute_calibration_numbers(in_data, "alpha", "spanish")
+
+    # Checks
+    assert computed_list == expected_values
+
+
+def test_register_vocabulary(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the registration of new vocabularies and the caching of their matchers."""
+
+    # Inputs
+    monkeypatch.setattr(day_1, "VOCABULARIES", dict(day_1.VOCABULARIES))
+    words = {"un": "1", "deux": "2", "trois": "3"}
+
+    # Element Under Test (EUT)
+    register_vocabulary("french", words)
+    computed_matchers = get_vocabulary_matchers("french")
+    computed_list, __ = compute_calibration_numbers(["undeuxtrois"], "alpha", "french")
+
+    # Checks
+    assert get_vocabulary_matchers("french") is computed_matchers
+    assert computed_list == [13]
+    with pytest.raises(ValueError):
+        register_vocabulary("broken", {"ten": "10"})
+    with pytest.raises(ValueError):
+        get_vocabulary_matchers("klingon")
+
+
+def test_line_cache() -> None:
+    """Test the LRU eviction and the counters of the line cache."""
+
+    # Inputs
+    cache = LineCache(maxsize=2)
+
+    # Element Under Test (EUT)
+    computed_values = [
+        cache.get_or_compute("a", lambda: 1),
+        cache.get_or_compute("b", lambda: 2),
+        cache.get_or_compute("a", lambda: 0),
+        cache.get_or_compute("c", lambda: 3),
+        cache.get_or_compute("b", lambda: 4),
+    ]
+
+    # Checks
+    assert computed_values == [1, 2, 1, 3, 4]
+    assert (cache.hits, cache.misses) == (1, 4)
+    assert len(cache) == 2
+    assert cache.hit_ratio == 0.2
+
+
+def test_day_1_calibration_report_cached() -> None:
+    """Test the computation of the calibration values with duplicated lines and a line cache."""
+
+    # Inputs
+    in_data = ["two1nine", "nodigits", "eightwothree", "two1nine", "nodigits"] * 3
+    cache = LineCache()
+
+    # Expected outputs
+    expected_values, expected_checksum = compute_calibration_numbers(in_data, "alpha")
+
+    # Element Under Test (EUT)
+    computed_list, computed_checksum = compute_calibration_numbers(
+        in_data, "alpha", cache=cache
+    )
+
+    # Checks
+    assert computed_list == expected_values
+    assert computed_checksum == expected_checksum
+    assert (cache.hits, cache.misses) == (12, 3)
@@ -10,16 +10,34 @@ Copyright (c) 2023 Andrés Ferreiro González
 See project license for more info
 """
 
+from pathlib import Path
+
+import pytest
 
 from aoc2023.problems.day_2 import (
+    ColourSchema,
+    FeasibilityIndex,
+    GameAggregator,
+    GameStore,
     check_posible_games,
+    compute_game_checksums,
     compute_min_values_per_game,
     compute_sum_of_powers,
     get_min_posible_values_for_game,
     is_game_posible,
+    parse_bag_configurations,
+    parse_game_max_values,
     split_game,
 )
 
+EXAMPLE_GAMES = [
+    "Game 1: 3 blue, 4 red; 1 red, 2 green, 6 blue; 2 green",
+    "Game 2: 1 blue, 2 green; 3 green, 4 blue, 1 red; 1 green, 1 blue",
+    "Game 3: 8 green, 6 blue, 20 red; 5 blue, 4 red, 13 green; 5 green, 1 red",
+    "Game 4: 1 green, 3 red, 6 blue; 3 green, 6 red; 3 green, 15 blue, 14 red",
+    "Game 5: 6 red, 1 blue, 3 green; 2 blue, 1 red, 2 green",
+]
+
 
 def test_split_game() -> None:
     """Tests the function that splits a game iteration into id and sets."""
@@ -213,3 +231,191 @@ def test_compute_sum_of_powers() -> None:
 
     # Checks
     assert computed_sum == expected_sum
+
+
+def test_parse_game_max_values() -> None:
+    """Tests the single pass parser of the maximum values of a game."""
+
+    # Inputs
+    game = "Game 13: 8 green, 6 blue, 20 red; 2 blue, 4 red, 13 green; 5 green, 1 red"
+
+    # Expected outputs
+    expected_game_id = 13
+    expected_max_values = (20, 13, 6)
+
+    # Element Under Test (EUT)
+    computed_id, computed_max_values = parse_game_max_values(game)
+
+    # Checks
+    assert computed_id == expected_game_id
+    assert computed_max_values == expected_max_values
+
+
+def test_compute_game_checksums() -> None:
+    """Tests the computation of the checksums of both problems in a single pass."""
+
+    # Expected outputs
+    expected_ids_sum = 8
+    expected_sum_of_powers = 2286
+
+    # Element Under Test (EUT)
+    computed_ids_sum, computed_sum_of_powers = compute_game_checksums(
+        EXAMPLE_GAMES, (12, 13, 14)
+    )
+
+    # Checks
+    assert computed_ids_sum == expected_ids_sum
+    assert computed_sum_of_powers == expected_sum_of_powers
+
+
+def test_game_store() -> None:
+    """Tests the columnar game store and its batched bag queries."""
+
+    # Inputs
+    bags = [(12, 13, 14), (20, 13, 15), (1, 1, 1)]
+
+    # Expected outputs
+    expected_sums = [8, 15, 0]
+    expected_sum_of_powers = 2286
+
+    # Element Under Test (EUT)
+    store = GameStore.from_lines(EXAMPLE_GAMES)
+
+    # Checks
+    assert len(store) == len(EXAMPLE_GAMES)
+    assert list(store.game_ids) == [1, 2, 3, 4, 5]
+    assert list(store.columns[0]) == [4, 1, 20, 14, 6]
+    assert store.posible_ids_sums(bags) == expected_sums
+    assert [store.posible_ids_sum(bag) for bag in bags] == expected_sums
+    assert store.sum_of_powers() == expected_sum_of_powers
+
+
+def test_parse_bag_configurations() -> None:
+    """Tests the parsing of bag configurations."""
+
+    # Inputs
+    lines = ["# red green blue", "12 13 14", "", "20, 13, 15"]
+
+    # Expected outputs
+    expected_bags = [(12, 13, 14), (20, 13, 15)]
+
+    # Element Under Test (EUT)
+    computed_bags = parse_bag_configurations(lines)
+
+    # Checks
+    assert computed_bags == expected_bags
+    with pytest.raises(ValueError):
+        parse_bag_configurations(["12 13"])
+    with pytest.raises(ValueError, match="Invalid bag configuration"):
+        parse_bag_configurations(["12 x 14"])
+
+
+def test_feasibility_index() -> None:
+    """Tests that the dominance index answers the same as a linear scan of the store."""
+
+    # Inputs
+    store = GameStore.from_lines(EXAMPLE_GAMES)
+    bags = [
+        (r, g, b) for r in range(0, 22, 3) for g in range(0, 15, 2) for b in range(17)
+    ]
+
+    # Element Under Test (EUT)
+    index = FeasibilityIndex(store)
+
+    # Checks
+    assert [index.posible_ids_sum(bag) for bag in bags] == store.posible_ids_sums(bags)
+    assert index.posible_ids_sum((12, 13, 14)) == 8
+    with pytest.raises(ValueError):
+        FeasibilityIndex(store, max_cells=10)
+
+
+def test_feasibility_index_empty() -> None:
+    """Tests the dominance index of an empty store."""
+
+    # Element Under Test (EUT)
+    index = FeasibilityIndex(GameStore.from_lines([]))
+
+    # Checks
+    assert index.posible_ids_sum((12, 13, 14)) == 0
+
+
+def test_colour_schema() -> None:
+    """Tests the day 2 pipeline over a custom set of colours."""
+
+    # Inputs
+    list_of_games = [
+        "Game 1: 3 blue, 4 red, 2 pink; 1 red, 2 green, 7 cyan",
+        "Game 2: 1 blue, 2 green, 9 pink; 5 cyan, 1 red, 3 pinkish",
+    ]
+    bags = [(4, 2, 3, 7, 2), (4, 2, 3, 9, 9)]
+
+    # Expected outputs
+    expected_sets = [(4, 0, 3, 0, 2), (1, 2, 0, 7, 0)]
+    expected_min_values = [(4, 2, 3, 7, 2), (1, 2, 1, 5, 9)]
+    expected_sums = [1, 3]
+    expected_sum_of_powers = 336 + 90
+
+    # Element Under Test (EUT)
+    schema = ColourSchema.from_string("red, green, blue, cyan, pink")
+    store = GameStore.from_lines(list_of_games, schema)
+
+    # Checks
+    assert len(schema) == 5
+    assert schema.index["cyan"] == 3
+    assert split_game(list_of_games[0], schema) == (1, expected_sets)
+    assert compute_min_values_per_game(list_of_games, schema) == expected_min_values
+    assert compute_sum_of_powers(expected_min_values) == expected_sum_of_powers
+    assert store.posible_ids_sums(bags) == expected_sums
+    assert store.sum_of_powers() == expected_sum_of_powers
+    assert parse_bag_configurations(["4 2 3 7 2"], schema) == bags[:1]
+    with pytest.raises(ValueError):
+        ColourSchema(("red", "red"))
+    with pytest.raises(ValueError):
+        ColourSchema(tuple(f"colour{chr(97 + index)}" for index in range(17)))
+
+
+def test_game_aggregator_feed() -> None:
+    """Tests that the aggregator matches the batch checksums when fed with arbitrary chunks."""
+
+    # Inputs
+    data = ("\n".join(EXAMPLE_GAMES) + "\n").encode("UTF-8")
+    chunks = [data[:10], data[10:70], data[70:71], data[71:200], data[200:]]
+
+    # Expected outputs
+    expected_checksums = compute_game_checksums(EXAMPLE_GAMES, (12, 13, 14))
+
+    # Element Under Test (EUT)
+    aggregator = GameAggregator((12, 13, 14))
+    n_games = [aggregator.feed(chunk) for chunk in chunks]
+
+    # Checks
+    assert sum(n_games) == len(EXAMPLE_GAMES)
+    assert aggregator.offset == len(data)
+    assert aggregator.checksums == expected_checksums
+    with pytest.raises(ValueError):
+        GameAggregator((12, 13))
+
+
+def test_game_aggregator_update(tmp_path: Path) -> None:
+    """Tests tailing an append-only log file with the aggregator."""
+
+    # Inputs
+    file = tmp_path / "games.txt"
+    file.write_text("\n".join(EXAMPLE_GAMES[:2]) + "\n" + EXAMPLE_GAMES[2][:20])
+
+    # Element Under Test (EUT)
+    aggregator = GameAggregator((12, 13, 14))
+    first_update = aggregator.update(file)
+    with file.open("a") as fd:
+        fd.write(EXAMPLE_GAMES[2][20:] + "\n" + "\n".join(EXAMPLE_GAMES[3:]))
+    second_update = aggregator.update(file)
+    flushed = aggregator.flush()
+
+    # Checks
+    assert (first_update, second_update, flushed) == (2, 2, 1)
+    assert aggregator.checksums == (8, 2286)
+    assert aggregator.update(file) == 0
+
+    file.write_text(EXAMPLE_GAMES[0] + "\n")
+    assert aggregator.update(file) == 1
+    assert aggregator.checksums == (1, 48)
@@ -10,15 +10,25 @@ Copyright (c) 2023 Andrés Ferreiro González
 See project license for more info
 """
 
+import pytest
+
 from aoc2023.problems.day_3 import (
+    GEAR_EVENT,
+    PART_EVENT,
     Gear,
     Number,
+    Schematic,
     Symbol,
+    build_symbol_masks,
     compute_gear_ratios,
     compute_parts_sum,
+    dilate_masks,
+    encode_row,
     find_gears,
     find_part_numbers,
+    iter_parts_and_gears,
     parse_lines,
+    solve_streaming,
 )
 
 
@@ -232,6 +242,35 @@ def test_find_gears() -> None:
         assert computed_gear.parts == expected_gear.parts
 
 
+def test_find_gears_longer_input() -> None:
+    """Tests the function that finds gears on a longer input, with parts shared between gears."""
+
+    # Inputs
+    rows = [
+        "467..114..",
+        "...*......",
+        "..35..633.",
+        "......#...",
+        "617*......",
+        ".....+.58.",
+        "..592.....",
+        "......755.",
+        "...$.*....",
+        ".664*598..",
+    ]
+
+    # Expected outputs
+    expected_positions = [(1, 3), (8, 5), (9, 4)]
+    expected_parts = [[467, 35], [755, 598], [664, 598]]
+
+    # Element Under Test (EUT)
+    computed_gears = find_gears(*parse_lines(rows))
+
+    # Checks
+    assert [gear.position for gear in computed_gears] == expected_positions
+    assert [gear.parts for gear in computed_gears] == expected_parts
+
+
 def test_compute_gear_ratios() -> None:
     """Test the function that compute gear ratios."""
 
@@ -251,3 +290,199 @@ def test_compute_gear_ratios() -> None:
     # Checks
     assert len(computed_gear_ratios) == len(expected_gear_ratios)
     assert computed_gear_ratios == expected_gear_ratios
+
+
+def test_schematic() -> None:
+    """Tests the grid backed schematic against the object based functions."""
+
+    # Inputs
+    rows = [
+        "467..114..",
+        "...*......",
+        "..35..633.",
+        "......#...",
+        "617*......",
+        ".....+.58.",
+        "..592.....",
+        "......755.",
+        "...$.*....",
+        ".664*598",
+    ]
+
+    # Expected outputs
+    expected_part_numbers = [467, 35, 633, 617, 592, 755, 664, 598]
+    expected_gears = find_gears(*parse_lines(rows))
+
+    # Element Under Test (EUT)
+    schematic = Schematic(rows)
+    computed_gears = schematic.gears()
+
+    # Checks
+    assert len(schematic) == 10
+    assert (schematic.height, schematic.width) == (10, 10)
+    assert list(schematic.rows[:3]) == [0, 0, 2]
+    assert list(schematic.starts[:3]) == [0, 5, 2]
+    assert list(schematic.ends[:3]) == [3, 8, 4]
+    assert schematic.part_numbers() == expected_part_numbers
+    assert [gear.position for gear in computed_gears] == [
+        gear.position for gear in expected_gears
+    ]
+    assert [gear.parts for gear in computed_gears] == [
+        gear.parts for gear in expected_gears
+    ]
+    assert not hasattr(Number(0, 0, 1, "1"), "__dict__")
+    assert not hasattr(Gear(0, 0), "__dict__")
+
+
+def test_schematic_non_ascii() -> None:
+    """Tests that the grid backed schematic works on character columns for non ASCII rows."""
+
+    # Inputs
+    rows = ["ëë2*3", "ü....", "..٣.."]
+
+    # Expected outputs
+    expected_part_numbers = [2, 3]
+    expected_gears = find_gears(*parse_lines(rows))
+
+    # Element Under Test (EUT)
+    schematic = Schematic(rows)
+    computed_gears = schematic.gears()
+
+    # Checks
+    assert encode_row(rows[0]) == b"##2*3"
+    assert encode_row(rows[2]) == b"..3.."
+    assert schematic.part_numbers() == expected_part_numbers
+    assert [(gear.position, gear.parts) for gear in computed_gears] == [
+        (gear.position, gear.parts) for gear in expected_gears
+    ]
+    assert [gear.parts for gear in computed_gears] == [[2, 3]]
+
+
+def test_dilate_masks() -> None:
+    """Tests the construction and 3x3 dilation of the symbols masks."""
+
+    # Inputs
+    rows = [b"467..", b"...*.", b".....", b"#...."]
+
+    # Expected outputs
+    expected_masks = [0b00000, 0b01000, 0b00000, 0b00001]
+    expected_dilated = [0b11100, 0b11100, 0b11111, 0b00011]
+
+    # Element Under Test (EUT)
+    computed_masks = build_symbol_masks(rows)
+    computed_dilated = dilate_masks(computed_masks)
+
+    # Checks
+    assert computed_masks == expected_masks
+    assert computed_dilated == expected_dilated
+
+
+def test_find_part_numbers_dilation() -> None:
+    """Tests that the mask dilation strategy finds the same part numbers as the default one."""
+
+    # Inputs
+    rows = [
+        "467..114..",
+        "...*......",
+        "..35..633.",
+        "......#...",
+        "617*......",
+        ".....+.58.",
+        "..592.....",
+        "......755.",
+        "...$.*....",
+        ".664.598..",
+    ]
+
+    # Expected outputs
+    expected_part_numbers = [467, 35, 633, 617, 592, 755, 664, 598]
+
+    # Element Under Test (EUT)
+    computed_part_numbers = find_part_numbers(rows, strategy="dilation")
+
+    # Checks
+    assert computed_part_numbers == expected_part_numbers
+    assert find_part_numbers(["..1", "2.."], strategy="dilation") == []
+    with pytest.raises(ValueError):
+        find_part_numbers(rows, strategy="sets")
+
+
+def test_find_part_numbers_dilation_non_ascii() -> None:
+    """Tests that the mask dilation strategy works on character columns for non ASCII rows."""
+
+    # Inputs
+    rows = ["ëë..5", "...*.", ".7..."]
+
+    # Expected outputs
+    expected_part_numbers = [5]
+
+    # Element Under Test (EUT)
+    computed_part_numbers = find_part_numbers(rows, strategy="dilation")
+
+    # Checks
+    assert computed_part_numbers == expected_part_numbers
+    assert computed_part_numbers == find_part_numbers(rows, strategy="grid")
+
+
+def test_iter_parts_and_gears() -> None:
+    """Tests that the streaming solver emits the values of a row once the next one is read."""
+
+    # Inputs
+    rows = [
+        "467..114..",
+        "...*......",
+        "..35..633.",
+        "......#...",
+        "617*......",
+        ".....+.58.",
+        "..592.....",
+        "......755.",
+        "...$.*....",
+        ".664.598..",
+    ]
+    consumed = []
+
+    def source():
+        for row in rows:
+            consumed.append(row)
+            yield row
+
+    # Expected outputs
+    expected_parts = find_part_numbers(rows)
+    expected_ratios = compute_gear_ratios(find_gears(*parse_lines(rows)))
+
+    # Element Under Test (EUT)
+    events = iter_parts_and_gears(source())
+    first_event = next(events)
+    consumed_rows = len(consumed)
+    remaining_events = list(events)
+
+    # Checks
+    assert first_event == (PART_EVENT, 467)
+    assert consumed_rows == 2
+    computed_events = [first_event, *remaining_events]
+    assert [v for kind, v in computed_events if kind == PART_EVENT] == expected_parts
+    assert [v for kind, v in computed_events if kind == GEAR_EVENT] == expected_ratios
+    assert solve_streaming(rows) == (4361, 467835)
+    assert solve_streaming([]) == (0, 0)
+
+
+def test_solve_streaming_non_ascii() -> None:
+    """Tests that the streaming solver works on character columns for non ASCII rows."""
+
+    # Inputs
+    rows = ["ëë..5", "...*.", ".7..."]
+    gear_rows = ["ëë2*3", "ü....", "..٣.."]
+
+    # Expected outputs
+    expected_checksums = (5, 0)
+    expected_gear_checksums = (5, 6)
+
+    # Element Under Test (EUT)
+    computed_checksums = solve_streaming(rows)
+    computed_gear_checksums = solve_streaming(gear_rows)
+
+    # Checks
+    assert computed_checksums == expected_checksums
+    assert computed_checksums[0] == sum(find_part_numbers(rows))
+    assert computed_gear_checksums == expected_gear_checksums
@@ -10,16 +10,69 @@ Copyright (c) 2023 Andrés Ferreiro González
 See project license for more info
 """
 
+import pytest
 
 from aoc2023.problems.day_5 import (
+    ALMANAC_UPPER_BOUND,
+    Almanac,
+    AlmanacSession,
+    CompactAlmanac,
+    build_stage_index,
+    compile_almanac,
+    compose_maps,
     expand_seeds_list,
     find_location_for_initial_seed,
+    find_location_in_composed_table,
+    find_lowest_location_reverse,
+    fold_min,
+    generate_lookup_source,
     initialize_dicts,
+    iter_locations,
+    merge_ranges,
     parse_lines,
     solve_part_1,
     solve_part_2,
+    solve_part_2_brute_force,
+    solve_part_2_reverse,
+    split_seed_ranges,
 )
 
+EXAMPLE_ALMANAC = [
+    "seeds: 79 14 55 13",
+    "",
+    "seed-to-soil map:",
+    "50 98 2",
+    "52 50 48",
+    "",
+    "soil-to-fertilizer map:",
+    "0 15 37",
+    "37 52 2",
+    "39 0 15",
+    "",
+    "fertilizer-to-water map:",
+    "49 53 8",
+    "0 11 42",
+    "42 0 7",
+    "57 7 4",
+    "",
+    "water-to-light map:",
+    "88 18 7",
+    "18 25 70",
+    "",
+    "light-to-temperature map:",
+    "45 77 23",
+    "81 45 19",
+    "68 64 13",
+    "",
+    "temperature-to-humidity map:",
+    "0 69 1",
+    "1 0 69",
+    "",
+    "humidity-to-location map:",
+    "60 56 37",
+    "56 93 4",
+]
+
 
 def test_initialize_dicts() -> None:
     # Expected outputs
@@ -332,3 +385,444 @@ def test_solve_part_2() -> None:
 
     # Checks
     assert computed_location == expected_location
+
+
+def test_almanac_split_range() -> None:
+    # Inputs
+    in_range = range(40, 110)
+    almanac = Almanac([build_stage_index([(98, 100, 50), (50, 98, 52)])])
+
+    # Expected outputs
+    expected_pieces = [
+        (range(40, 50), 0),
+        (range(50, 98), 2),
+        (range(98, 100), -48),
+        (range(100, 110), 0),
+    ]
+
+    # Element Under Test (EUT)
+    computed_pieces = almanac.split_range(in_range, 0)
+
+    # Checks
+    assert computed_pieces == expected_pieces
+    assert not almanac.split_range(range(10, 10), 0)
+
+
+def test_almanac_map_ranges() -> None:
+    # Inputs
+    in_ranges = [range(79, 93), range(55, 68)]
+    almanac = Almanac([build_stage_index([(98, 100, 50), (50, 98, 52)])])
+
+    # Expected outputs
+    expected_ranges = [range(81, 95), range(57, 70)]
+
+    # Element Under Test (EUT)
+    computed_ranges = almanac.map_ranges(in_ranges, 0)
+
+    # Checks
+    assert computed_ranges == expected_ranges
+
+
+def test_almanac_propagate() -> None:
+    # Inputs
+    seeds, maps = parse_lines(EXAMPLE_ALMANAC)
+    seed_ranges = [range(seed, seed + 1) for seed in seeds]
+
+    # Expected outputs
+    expected_locations = [82, 43, 86, 35]
+
+    # Element Under Test (EUT)
+    computed_ranges = Almanac.from_maps(maps).propagate(seed_ranges)
+
+    # Checks
+    assert [rng.start for rng in computed_ranges] == expected_locations
+    assert all(len(rng) == 1 for rng in computed_ranges)
+
+
+def test_compose_maps() -> None:
+    # Inputs
+    __, maps = parse_lines(EXAMPLE_ALMANAC)
+
+    # Element Under Test (EUT)
+    computed_table = compose_maps(maps)
+
+    # Checks
+    assert computed_table[0][0] == 0
+    assert computed_table[-1][1] == ALMANAC_UPPER_BOUND
+    assert all(
+        prev[1] == curr[0] for prev, curr in zip(computed_table, computed_table[1:])
+    )
+    assert [
+        find_location_in_composed_table(seed, computed_table) for seed in range(120)
+    ] == [find_location_for_initial_seed(seed, maps) for seed in range(120)]
+
+
+def test_compose_maps_cached() -> None:
+    # Inputs
+    __, maps = parse_lines(EXAMPLE_ALMANAC)
+    __, maps_copy = parse_lines(EXAMPLE_ALMANAC)
+
+    # Element Under Test (EUT)
+    computed_table = compose_maps(maps)
+
+    # Checks
+    assert compose_maps(maps_copy) is computed_table
+
+
+def test_build_stage_index() -> None:
+    # Inputs
+    entries = [(98, 100, 50), (50, 98, 52)]
+
+    # Expected outputs
+    expected_starts = [0, 50, 98, 100]
+    expected_ends = [50, 98, 100, ALMANAC_UPPER_BOUND]
+    expected_offsets = [0, 2, -48, 0]
+
+    # Element Under Test (EUT)
+    computed_starts, computed_ends, computed_offsets = build_stage_index(entries)
+
+    # Checks
+    assert computed_starts == expected_starts
+    assert computed_ends == expected_ends
+    assert computed_offsets == expected_offsets
+
+
+def test_almanac_find_location() -> None:
+    # Inputs
+    __, maps = parse_lines(EXAMPLE_ALMANAC)
+
+    # Element Under Test (EUT)
+    almanac = Almanac.from_maps(maps)
+
+    # Checks
+    assert len(almanac.stages) == len(maps)
+    assert all(
+        almanac.find_location(seed) == find_location_for_initial_seed(seed, maps)
+        for seed in range(0, 120)
+    )
+
+
+def test_almanac_find_lowest_location() -> None:
+    # Inputs
+    seeds, maps = parse_lines(EXAMPLE_ALMANAC)
+
+    # Expected outputs
+    expected_location = 46
+
+    # Element Under Test (EUT)
+    almanac = Almanac.from_maps(maps)
+    computed_location = almanac.find_lowest_location(expand_seeds_list(seeds))
+
+    # Checks
+    assert computed_location == expected_location
+    assert almanac.composed_table == compose_maps(maps)
+
+
+def test_almanac_sweep() -> None:
+    # Inputs
+    almanac = Almanac([build_stage_index([(98, 100, 50), (50, 98, 52)])])
+    sorted_values = [10, 49, 50, 60, 98, 99, 120]
+
+    # Expected outputs
+    expected_runs = [[10, 49], [52, 62], [50, 51], [120]]
+
+    # Element Under Test (EUT)
+    computed_runs = almanac.sweep(sorted_values, 0)
+
+    # Checks
+    assert computed_runs == expected_runs
+    assert almanac.sweep([10, 120], 0) == [[10], [120]]
+
+
+def test_almanac_find_lowest_location_for_seeds() -> None:
+    # Inputs
+    __, maps = parse_lines(EXAMPLE_ALMANAC)
+    seeds = [97, 3, 79, 14, 55, 13, 14, 99, 42]
+
+    # Expected outputs
+    expected_location = min(
+        find_location_for_initial_seed(seed, maps) for seed in seeds
+    )
+
+    # Element Under Test (EUT)
+    almanac = Almanac.from_maps(maps)
+    computed_location = almanac.find_lowest_location_for_seeds(seeds)
+
+    # Checks
+    assert computed_location == expected_location
+
+
+def test_split_seed_ranges() -> None:
+    # Inputs
+    seed_ranges = [range(79, 93), range(55, 68)]
+
+    # Expected outputs
+    expected_chunks = [range(79, 84), range(84, 89), range(89, 93), range(55, 60)]
+    expected_chunks += [range(60, 65), range(65, 68)]
+
+    # Element Under Test (EUT)
+    computed_chunks = split_seed_ranges(seed_ranges, 5)
+
+    # Checks
+    assert computed_chunks == expected_chunks
+
+
+def test_solve_part_2_brute_force() -> None:
+    # Expected outputs
+    expected_location = 46
+
+    # Element Under Test (EUT)
+    computed_location = solve_part_2_brute_force(EXAMPLE_ALMANAC, 2, chunk_size=4)
+
+    # Checks
+    assert computed_location == expected_location
+
+
+def test_almanac_inverted() -> None:
+    # Inputs
+    __, maps = parse_lines(EXAMPLE_ALMANAC)
+    almanac = Almanac.from_maps(maps)
+
+    # Element Under Test (EUT)
+    inverse = almanac.inverted()
+
+    # Checks
+    assert [
+        inverse.find_location(almanac.find_location(s)) for s in range(120)
+    ] == list(range(120))
+
+
+def test_almanac_inverted_not_invertible() -> None:
+    # Inputs
+    almanac = Almanac([build_stage_index([(10, 20, 0)])])
+
+    # Element Under Test (EUT) & Checks
+    with pytest.raises(ValueError):
+        almanac.inverted()
+
+
+def test_find_lowest_location_reverse() -> None:
+    # Inputs
+    seeds, maps = parse_lines(EXAMPLE_ALMANAC)
+    almanac = Almanac.from_maps(maps)
+
+    # Expected outputs
+    expected_location = 46
+
+    # Element Under Test (EUT)
+    computed_location = find_lowest_location_reverse(almanac, expand_seeds_list(seeds))
+
+    # Checks
+    assert computed_location == expected_location
+    with pytest.raises(ValueError):
+        find_lowest_location_reverse(almanac, expand_seeds_list(seeds), limit=46)
+
+
+def test_solve_part_2_reverse() -> None:
+    # Expected outputs
+    expected_location = 46
+
+    # Element Under Test (EUT)
+    computed_location = solve_part_2_reverse(EXAMPLE_ALMANAC)
+
+    # Checks
+    assert computed_location == expected_location
+
+
+def test_iter_locations() -> None:
+    # Inputs
+    seeds, maps = parse_lines(EXAMPLE_ALMANAC)
+
+    # Expected outputs
+    expected_locations = [82, 43, 86, 35]
+
+    # Element Under Test (EUT)
+    computed_locations = iter_locations(Almanac.from_maps(maps), iter(seeds))
+
+    # Checks
+    assert list(computed_locations) == expected_locations
+
+
+def test_fold_min_progress() -> None:
+    # Inputs
+    batches = [(1, 82), (1, 43), (1, 86), (1, 35), (1, 50)]
+    reports = []
+
+    # Expected outputs
+    expected_location = 35
+    expected_reports = [(2, 43), (4, 35), (5, 35)]
+
+    # Element Under Test (EUT)
+    computed_location = fold_min(
+        iter(batches), lambda n, best: reports.append((n, best)), every=2
+    )
+
+    # Checks
+    assert computed_location == expected_location
+    assert reports == expected_reports
+
+
+def test_fold_min_empty() -> None:
+    # Element Under Test (EUT) & Checks
+    with pytest.raises(ValueError):
+        fold_min(iter([]))
+
+
+def test_solve_parts_with_progress() -> None:
+    # Inputs
+    reports = []
+
+    # Expected outputs
+    expected_reports = [(4, 35), (27, 46)]
+
+    # Element Under Test (EUT)
+    computed_part_1 = solve_part_1(EXAMPLE_ALMANAC, lambda *r: reports.append(r))
+    computed_part_2 = solve_part_2(EXAMPLE_ALMANAC, lambda *r: reports.append(r))
+
+    # Checks
+    assert computed_part_1 == 35
+    assert computed_part_2 == 46
+    assert reports == expected_reports
+
+
+def test_generate_lookup_source() -> None:
+    # Inputs
+    table = ((0, 50, 0), (50, 98, 2), (98, 100, -48), (100, ALMANAC_UPPER_BOUND, 0))
+
+    # Expected outputs
+    expected_lines = [
+        "    if seed < 98:",
+        "        if seed < 50:",
+        "            return seed",
+        "            return seed + 2",
+        "            return seed - 48",
+    ]
+
+    # Element Under Test (EUT)
+    computed_source = generate_lookup_source(table)
+
+    # Checks
+    assert computed_source.startswith("def find_location(seed):")
+    assert all(line in computed_source.splitlines() for line in expected_lines)
+
+
+def test_compile_almanac() -> None:
+    # Inputs
+    __, maps = parse_lines(EXAMPLE_ALMANAC)
+    almanac = Almanac.from_maps(maps)
+
+    # Element Under Test (EUT)
+    computed_lookup = compile_almanac(almanac)
+
+    # Checks
+    assert compile_almanac(Almanac.from_maps(maps)) is computed_lookup
+    assert [computed_lookup(seed) for seed in range(120)] == [
+        find_location_for_initial_seed(seed, maps) for seed in range(120)
+    ]
+    with pytest.raises(ValueError):
+        computed_lookup(-1)
+
+
+def test_compact_almanac_from_lines() -> None:
+    # Inputs
+    seeds, maps = parse_lines(EXAMPLE_ALMANAC)
+
+    # Element Under Test (EUT)
+    compact = CompactAlmanac.from_lines(EXAMPLE_ALMANAC)
+
+    # Checks
+    assert list(compact.seeds) == seeds
+    assert [
+        [(src, src + n, dst) for src, n, dst in zip(*columns)]
+        for columns in zip(compact.src_starts, compact.lengths, compact.dst_starts)
+    ] == [[(src.start, src.stop, dst.start) for src, dst in mp] for mp in maps.values()]
+    assert [compact.find_location(seed) for seed in range(120)] == [
+        find_location_for_initial_seed(seed, maps) for seed in range(120)
+    ]
+    assert compact.to_almanac().composed_table == compose_maps(maps)
+
+
+def test_compact_almanac_bytes() -> None:
+    # Inputs
+    compact = CompactAlmanac.from_lines(EXAMPLE_ALMANAC)
+
+    # Element Under Test (EUT)
+    computed_compact = CompactAlmanac.from_bytes(compact.to_bytes())
+
+    # Checks
+    assert computed_compact.seeds == compact.seeds
+    assert computed_compact.src_starts == compact.src_starts
+    assert computed_compact.lengths == compact.lengths
+    assert computed_compact.dst_starts == compact.dst_starts
+    with pytest.raises(ValueError):
+        CompactAlmanac.from_bytes(b"AOC4" + compact.to_bytes()[4:])
+    with pytest.raises(ValueError):
+        CompactAlmanac.from_bytes(compact.to_bytes()[:-16])
+    with pytest.raises(ValueError):
+        CompactAlmanac.from_bytes(compact.to_bytes() + bytes(8))
+    with pytest.raises(ValueError):
+        CompactAlmanac.from_bytes(compact.to_bytes()[:10])
+
+
+def test_merge_ranges() -> None:
+    # Inputs
+    in_ranges = [range(10, 20), range(0, 5), range(5, 7), range(15, 30), range(40, 40)]
+
+    # Expected outputs
+    expected_ranges = [range(0, 7), range(10, 30)]
+
+    # Element Under Test (EUT)
+    computed_ranges = merge_ranges(in_ranges)
+
+    # Checks
+    assert computed_ranges == expected_ranges
+
+
+def test_almanac_session_update_stage() -> None:
+    # Inputs
+    session = AlmanacSession.from_lines(EXAMPLE_ALMANAC)
+    images_before = list(session.images)
+    new_entries = [(range(25, 95), range(0, 70))]
+    edited_lines = [
+        "0 25 70" if line == "18 25 70" else line
+        for line in EXAMPLE_ALMANAC
+        if line != "88 18 7"
+    ]
+
+    # Expected outputs
+    expected_location = solve_part_2(edited_lines)
+
+    # Element Under Test (EUT)
+    initial_location = session.lowest_location
+    computed_location = session.update_stage("water-to-light", new_entries)
+
+    # Checks
+    assert initial_location == 46
+    assert computed_location == expected_location
+    assert session.images[:4] == images_before[:4]
+    assert session.images[4:] != images_before[4:]
+
+
+def test_almanac_session_update_stage_composed_table() -> None:
+    # Inputs
+    session = AlmanacSession.from_lines(EXAMPLE_ALMANAC)
+    table_before = session.almanac.composed_table
+    edited_lines = [
+        "0 25 70" if line == "18 25 70" else line
+        for line in EXAMPLE_ALMANAC
+        if line != "88 18 7"
+    ]
+
+    # Expected outputs
+    expected_almanac = Almanac.from_maps(parse_lines(edited_lines)[1])
+
+    # Element Under Test (EUT)
+    session.update_stage("water-to-light", [(range(25, 95), range(0, 70))])
+    compiled = compile_almanac(session.almanac)
+
+    # Checks
+    assert session.almanac.composed_table != table_before
+    assert session.almanac.composed_table == expected_almanac.composed_table
+    assert all(
+        compiled(seed) == expected_almanac.find_location(seed) for seed in range(120)
+    )